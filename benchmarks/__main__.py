@@ -0,0 +1,219 @@
+"""Benchmark suite for the interaction pipeline.
+
+    python -m benchmarks [--iterations N] [--output results.json] [--compare previous.json]
+
+Replays synthetic INTERACTION_CREATE payloads against a stub bot and `bot.http`
+and prints the results as JSON so runs can be diffed between releases."""
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import discord
+import interactions
+from .stubs import StubBot, StubHTTP, interaction_payload, components_payload, MESSAGE_TEMPLATE
+
+
+def summarize(samples_ns):
+    samples = sorted(samples_ns)
+
+    def percentile(p):
+        return samples[min(len(samples) - 1, int(len(samples) * p))] / 1000
+
+    return {
+        'iterations': len(samples),
+        'mean_us': statistics.fmean(samples) / 1000,
+        'p50_us': percentile(0.5),
+        'p90_us': percentile(0.9),
+        'p99_us': percentile(0.99),
+        'max_us': samples[-1] / 1000,
+        'ops_per_sec': 1e9 / statistics.fmean(samples),
+    }
+
+
+def time_sync(func, iterations):
+    for _ in range(min(iterations, 100)):
+        func()
+
+    samples = []
+    clock = time.perf_counter_ns
+    for _ in range(iterations):
+        start = clock()
+        func()
+        samples.append(clock() - start)
+
+    return samples
+
+
+async def time_async(func, iterations):
+    for _ in range(min(iterations, 100)):
+        await func()
+
+    samples = []
+    clock = time.perf_counter_ns
+    for _ in range(iterations):
+        start = clock()
+        await func()
+        samples.append(clock() - start)
+
+    return samples
+
+
+def allocations(func, iterations=200):
+    func()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    for _ in range(iterations):
+        func()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'peak_bytes': (peak - before),
+        'retained_bytes_per_call': (after - before) / iterations,
+    }
+
+
+async def bench_dispatch(iterations):
+    results = {}
+    payload = interaction_payload(rows=5, per_row=5)
+
+    for name, options in (('eager', {}), ('lazy', {'lazy': True}), ('lazy_parser_hook', {'lazy': True, 'parser_hook': True})):
+        bot = StubBot(asyncio.get_running_loop())
+        base = interactions.InitialiseComponentInteractionBase(bot, **options)
+
+        def dispatch():
+            base.handle_interaction(payload['d'])
+
+        result = summarize(time_sync(dispatch, iterations))
+        result.update(allocations(dispatch))
+        results[name] = result
+
+    return results
+
+
+async def bench_handler(iterations):
+    bot = StubBot(asyncio.get_running_loop(), StubHTTP())
+    interactions.InitialiseComponentInteractionBase(bot)
+    handler = bot.handler.handler
+    channel = discord.Object(20)
+    rows = interactions.Utils.parse_components(components_payload(rows=5, per_row=5))
+    layout = interactions.FrozenLayout(rows)
+
+    async def respond():
+        await handler.respond(555, 'token', 'content', rows, [], None, False, False, False, None)
+
+    async def respond_frozen():
+        await handler.respond(555, 'token', 'content', layout, [], None, False, False, False, None)
+
+    async def send():
+        await handler.send(channel, 'content', rows, [], None, False, False, None)
+
+    edits = itertools.count()
+
+    async def edit_message():
+        #changes every time, otherwise this would only time skipping an unchanged edit
+        await handler.edit_message(20, 100, f'content {next(edits)}', None, rows)
+
+    return {
+        'respond': summarize(await time_async(respond, iterations)),
+        'respond_frozen_layout': summarize(await time_async(respond_frozen, iterations)),
+        'send': summarize(await time_async(send, iterations)),
+        'edit_message': summarize(await time_async(edit_message, iterations)),
+    }
+
+
+def bench_components(iterations):
+    loop = asyncio.new_event_loop()
+    bot = StubBot(loop)
+    payload = components_payload(rows=5, per_row=5)
+    rows = interactions.Utils.parse_components(payload)
+    layout = interactions.FrozenLayout(rows)
+    message = dict(MESSAGE_TEMPLATE, id='100', components=payload)
+
+    results = {
+        'button_to_dict': summarize(time_sync(rows[0].components[0].to_dict, iterations)),
+        'action_rows_to_dict': summarize(time_sync(lambda: [row.to_dict() for row in rows], iterations)),
+        'frozen_layout_override': summarize(time_sync(lambda: layout.with_overrides(disabled=True), iterations)),
+        'encode_json': summarize(time_sync(lambda: interactions.encode_json({'components': [row.to_dict() for row in rows]}), iterations)),
+        'encode_json_frozen': summarize(time_sync(lambda: interactions.encode_json({'components': layout}), iterations)),
+        'parse_components': summarize(time_sync(lambda: interactions.Utils.parse_components(payload), iterations)),
+        'component_message': summarize(time_sync(lambda: interactions.ComponentMessage(state=bot._connection, channel=None, data=message), iterations)),
+    }
+    results['parse_components'].update(allocations(lambda: interactions.Utils.parse_components(payload)))
+    results['component_message'].update(allocations(lambda: interactions.ComponentMessage(state=bot._connection, channel=None, data=message)))
+
+    loop.close()
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(iterations):
+    async def run_async():
+        return {
+            'dispatch': await bench_dispatch(iterations),
+            'handler': await bench_handler(iterations),
+        }
+
+    results = asyncio.run(run_async())
+    results['components'] = bench_components(iterations)
+
+    return {
+        'meta': {
+            'timestamp': time.time(),
+            'revision': git_revision(),
+            'python': sys.version.split()[0],
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'discord.py': discord.__version__,
+            'iterations': iterations,
+        },
+        'results': results,
+    }
+
+
+def compare(previous, current):
+    for group, benches in current['results'].items():
+        for name, result in benches.items():
+            old = previous.get('results', {}).get(group, {}).get(name)
+            if not old:
+                continue
+            change = (result['p50_us'] - old['p50_us']) / old['p50_us'] * 100
+            print(f'{group + "." + name:<40} p50 {old["p50_us"]:10.2f} -> {result["p50_us"]:10.2f} us ({change:+6.1f}%)', file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=5000)
+    parser.add_argument('--output', help='write the results to this file instead of stdout')
+    parser.add_argument('--compare', help='results from a previous run to print p50 changes against')
+    args = parser.parse_args()
+
+    results = run(args.iterations)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
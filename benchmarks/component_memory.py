@@ -0,0 +1,54 @@
+"""Per-message memory used by parsed component trees.
+
+    python -m benchmarks.component_memory
+"""
+import time
+import tracemalloc
+from interactions import Utils
+from .stubs import components_payload
+
+
+MESSAGES = 2000
+
+
+def select_payload(options=25):
+    return [{
+        'type': 1,
+        'components': [{
+            'type': 3,
+            'custom_id': 'select',
+            'placeholder': 'Pick one',
+            'min_values': 1,
+            'max_values': 1,
+            'options': [{'label': f'Option {i}', 'value': str(i), 'description': None, 'emoji': {'id': '1234', 'name': 'taka', 'animated': False}, 'default': False} for i in range(options)]
+        }]
+    }]
+
+
+def measure(name, payload):
+    Utils.parse_components(payload)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    parsed = [Utils.parse_components(payload) for _ in range(MESSAGES)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    used = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del parsed
+
+    start = time.perf_counter()
+    for _ in range(MESSAGES):
+        Utils.parse_components(payload)
+    elapsed = time.perf_counter() - start
+
+    print(f'{name:<28} {used / MESSAGES:8.0f} bytes/message  {elapsed / MESSAGES * 1e6:7.2f} us/parse')
+
+
+def main():
+    measure('25 buttons (5x5)', components_payload(rows=5, per_row=5))
+    measure('select with 25 options', select_payload())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Gateway events handled per second with the `on_socket_response` listener
+compared to hooking the INTERACTION_CREATE parser directly.
+
+    python -m benchmarks.gateway_filter
+"""
+import asyncio
+import time
+import interactions
+from discord.ext import commands
+from .stubs import interaction_payload
+
+
+EVENTS = 50000
+INTERACTION_EVERY = 100
+
+
+def event_mix():
+    other = [
+        {'op': 0, 's': 1, 't': 'PRESENCE_UPDATE', 'd': {'user': {'id': '7'}, 'status': 'online', 'guild_id': '1'}},
+        {'op': 0, 's': 1, 't': 'TYPING_START', 'd': {'user_id': '7', 'channel_id': '20', 'timestamp': 0}},
+        {'op': 0, 's': 1, 't': 'MESSAGE_CREATE', 'd': {'id': '1', 'channel_id': '20', 'content': 'hi'}},
+    ]
+    interaction = interaction_payload()
+
+    return [interaction if i % INTERACTION_EVERY == 0 else other[i % len(other)] for i in range(EVENTS)]
+
+
+async def run(parser_hook):
+    client = commands.Bot(command_prefix='!', loop=asyncio.get_running_loop())
+    base = interactions.InitialiseComponentInteractionBase(client, lazy=True, parser_hook=parser_hook)
+    parsers = client._connection.parsers
+    events = event_mix()
+
+    start = time.perf_counter()
+    for i, msg in enumerate(events):
+        #the parts of DiscordWebSocket.received_message that differ between the two modes
+        client.dispatch('socket_response', msg)
+        if msg['t'] == 'INTERACTION_CREATE':
+            func = parsers.get(msg['t'])
+            if func is not None:
+                func(msg['d'])
+
+        if i % 500 == 0:
+            await asyncio.sleep(0)
+
+    while len(asyncio.all_tasks()) > 1:
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+
+    await client.http.close()
+    return EVENTS / elapsed
+
+
+def main():
+    for parser_hook in (False, True):
+        rate = asyncio.run(run(parser_hook))
+        print(f'parser_hook={parser_hook!s:<5} {rate:12,.0f} events/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Compares the installed JSON backends on typical request bodies.
+
+    python -m benchmarks.json_backends
+"""
+import asyncio
+import time
+import discord
+import interactions
+from .stubs import StubBot, components_payload
+
+
+ITERATIONS = 20000
+
+
+def bodies(handler):
+    rows = interactions.Utils.parse_components(components_payload(rows=5, per_row=5))
+    embed = discord.Embed(title='Résumé', description='Ünïcödé content ✓ ' * 10)
+
+    return {
+        'respond': lambda: {'type': 4, 'data': handler.build_msg('Pick something', rows, [embed])},
+        'respond_frozen': (lambda layout: lambda: {'type': 4, 'data': handler.build_msg('Pick something', layout, [embed])})(interactions.FrozenLayout(rows)),
+        'defer': lambda: {'type': 6},
+    }
+
+
+def measure(build):
+    for _ in range(100):
+        interactions.encode_json(build())
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        interactions.encode_json(build())
+    elapsed = time.perf_counter() - start
+
+    return elapsed / ITERATIONS * 1e6, len(interactions.encode_json(build()))
+
+
+def main():
+    loop = asyncio.new_event_loop()
+    bot = StubBot(loop)
+    interactions.InitialiseComponentInteractionBase(bot)
+    cases = bodies(bot.handler.handler)
+    default = interactions.json_backend()
+
+    for name in interactions.JSON_BACKENDS:
+        interactions.set_json_backend(name)
+        for case, build in cases.items():
+            us, size = measure(build)
+            print(f'{name:<7} {case:<15} {us:8.2f} us/body  {size:6d} bytes')
+
+    interactions.set_json_backend(default)
+    loop.close()
+
+
+if __name__ == '__main__':
+    main()
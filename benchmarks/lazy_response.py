@@ -0,0 +1,55 @@
+"""Compares eager and lazy `InteractionResponse` construction.
+
+    python -m benchmarks.lazy_response
+"""
+import asyncio
+import time
+import tracemalloc
+import interactions
+from .stubs import StubBot, interaction_payload
+
+
+ITERATIONS = 20000
+
+
+async def run(lazy, touch):
+    bot = StubBot(asyncio.get_running_loop())
+    base = interactions.InitialiseComponentInteractionBase(bot, lazy=lazy)
+    payload = interaction_payload(rows=5, per_row=5)
+
+    @bot.router.callback(prefix='button:')
+    async def handler(resp):
+        if touch:
+            resp.message.components
+            resp.member.display_name
+        resp.message_id
+
+    for _ in range(100):
+        await base.on_socket_response(payload)
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await base.on_socket_response(payload)
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for _ in range(100):
+        await base.on_socket_response(payload)
+        await asyncio.sleep(0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed / ITERATIONS * 1e6, peak
+
+
+def main():
+    for lazy in (False, True):
+        for touch in (False, True):
+            us, peak = asyncio.run(run(lazy, touch))
+            print(f'lazy={lazy!s:<5} touches member/message={touch!s:<5} {us:8.2f} us/interaction  peak {peak / 1024:8.1f} KiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""Replays interactions recorded with `interactions.InteractionRecorder` against a stub bot.
+
+    python -m benchmarks.replay recording.jsonl.gz [--speed N] [--latency S] [--rate-limit P] [--setup module:function]
+
+`--speed 1` keeps the recorded timing, `--speed 10` plays it ten times as fast and `--speed 0` as fast as possible.
+REST calls go to a stub `bot.http` with simulated latency and 429s. Without `--setup` every interaction gets a
+`respond`, `defer` or `edit_original` (`--handler`); with it, `function(bot)` registers the handlers to profile instead."""
+import argparse
+import asyncio
+import importlib
+import json
+import statistics
+import sys
+import time
+import interactions
+from .stubs import StubBot, StubHTTP
+
+
+def load_setup(spec):
+    module, _, name = spec.partition(':')
+    return getattr(importlib.import_module(module), name or 'setup')
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    if not samples:
+        return {}
+
+    def percentile(p):
+        return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+
+    return {
+        'count': len(samples),
+        'mean_ms': statistics.fmean(samples) * 1000,
+        'p50_ms': percentile(0.5),
+        'p90_ms': percentile(0.9),
+        'p99_ms': percentile(0.99),
+        'max_ms': samples[-1] * 1000,
+    }
+
+
+async def replay(args):
+    loop = asyncio.get_running_loop()
+    http = StubHTTP(args.latency, args.jitter, args.rate_limit, args.retry_after, args.seed)
+    bot = StubBot(loop, http)
+    errors = []
+
+    async def on_error(event, *a):
+        errors.append(sys.exc_info()[1])
+    bot.on_error = on_error
+
+    timings = {}
+
+    def collect(kind, name, labels, value):
+        if kind == 'timing':
+            timings.setdefault(name, []).append(value)
+
+    base = interactions.InitialiseComponentInteractionBase(
+        bot,
+        lazy=args.lazy,
+        auto_defer=args.auto_defer,
+        metrics=interactions.Metrics(interactions.CallbackSink(collect)),
+    )
+
+    if args.setup:
+        result = load_setup(args.setup)(bot)
+        if asyncio.iscoroutine(result):
+            await result
+    elif args.handler != 'none':
+        async def handler(resp):
+            if args.handler == 'respond':
+                await resp.respond('replayed', ephemeral=True)
+            elif args.handler == 'defer':
+                await resp.defer(edit_original=True)
+            else:
+                await resp.edit_original(content=f'replayed {resp.custom_id}')
+
+        bot.router.add_callback(handler, pattern='')
+
+    replayed = 0
+    start = loop.time()
+    wall = time.perf_counter()
+
+    for offset, d in interactions.read_recording(args.recording):
+        if args.speed:
+            delay = start + offset / args.speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        base.handle_interaction(d)
+        replayed += 1
+        if not args.speed:
+            await asyncio.sleep(0)
+
+    fed = time.perf_counter() - wall
+    current = asyncio.current_task()
+    deadline = loop.time() + args.drain_timeout
+    while any(not t.done() for t in asyncio.all_tasks() if t is not current) and loop.time() < deadline:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - wall
+
+    return {
+        'interactions': replayed,
+        'feed_seconds': fed,
+        'total_seconds': elapsed,
+        'interactions_per_sec': replayed / elapsed if elapsed else None,
+        'rest_requests': http.requests,
+        'rest_rate_limited': http.rate_limited,
+        'handler_errors': len(errors),
+        'dispatch': percentiles(timings.get('interactions_dispatch_seconds', [])),
+        'first_response': percentiles(timings.get('interactions_first_response_seconds', [])),
+        'rest': percentiles(timings.get('interactions_rest_seconds', [])),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('recording')
+    parser.add_argument('--speed', type=float, default=0, help='playback speed multiplier, 0 for as fast as possible')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds every REST call takes')
+    parser.add_argument('--jitter', type=float, default=0.02, help='up to this many extra seconds per REST call')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='fraction of REST calls that get a 429')
+    parser.add_argument('--retry-after', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--handler', choices=('respond', 'defer', 'edit', 'none'), default='respond')
+    parser.add_argument('--setup', help='module:function called with the bot to register handlers')
+    parser.add_argument('--lazy', action='store_true')
+    parser.add_argument('--auto-defer', action='store_true')
+    parser.add_argument('--drain-timeout', type=float, default=30.0)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(replay(args)), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+import asyncio
+import random
+import discord
+from discord.state import ConnectionState
+
+
+MESSAGE_TEMPLATE = {
+    'channel_id': '20',
+    'content': 'Pick something',
+    'type': 0,
+    'attachments': [],
+    'embeds': [],
+    'mentions': [],
+    'mention_roles': [],
+    'pinned': False,
+    'mention_everyone': False,
+    'tts': False,
+    'timestamp': '2021-06-01T00:00:00.000000+00:00',
+    'edited_timestamp': None,
+    'flags': 0,
+    'author': {'id': '5', 'username': 'Taka', 'discriminator': '0001', 'avatar': None, 'bot': True},
+}
+
+
+class StubHTTP:
+    """Stands in for `bot.http`, answering every request without touching the network.
+
+    Requests take `latency` seconds plus up to `jitter` more. A `rate_limit` fraction of them get a simulated 429
+    which, like discord.py, is waited out for `retry_after` seconds and retried."""
+
+    def __init__(self, latency=0, jitter=0, rate_limit=0, retry_after=0.5, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.rate_limited = 0
+
+
+    async def request(self, route, **kwargs):
+        self.requests += 1
+        while True:
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+            if delay:
+                await asyncio.sleep(delay)
+            if not self.rate_limit or self.random.random() >= self.rate_limit:
+                break
+            self.rate_limited += 1
+            await asyncio.sleep(self.retry_after)
+
+        if route.method == 'DELETE' or '/callback' in route.path:
+            return None
+
+        return dict(MESSAGE_TEMPLATE, id='999', components=[])
+
+
+class StubBot:
+    """The bare minimum of `commands.Bot` that the library touches."""
+
+    def __init__(self, loop, http=None):
+        self.loop = loop
+        self.http = http or StubHTTP()
+        self.user = discord.Object(5)
+        self._connection = ConnectionState(dispatch=self.dispatch, handlers={}, hooks={}, syncer=None, http=self.http, loop=loop)
+        self._guilds = {}
+        self.dispatched = 0
+
+
+    def dispatch(self, event, *args):
+        self.dispatched += 1
+
+
+    def add_listener(self, func, name):
+        pass
+
+
+    def get_guild(self, guild_id):
+        return self._guilds.get(guild_id)
+
+
+    def get_channel(self, channel_id):
+        return None
+
+
+    async def fetch_guild(self, guild_id):
+        return discord.Object(guild_id)
+
+
+    async def on_error(self, event, *args):
+        raise
+
+
+def components_payload(rows=1, per_row=2):
+    return [
+        {
+            'type': 1,
+            'components': [
+                {'type': 2, 'style': 1, 'label': f'Button {r}-{c}', 'custom_id': f'button:{r}:{c}', 'emoji': {'name': '\N{WHITE HEAVY CHECK MARK}'}, 'disabled': False}
+                for c in range(per_row)
+            ]
+        }
+        for r in range(rows)
+    ]
+
+
+def interaction_payload(custom_id='button:0:0', message_id=100, guild_id=1, member_id=7, rows=1, per_row=2):
+    return {
+        'op': 0,
+        's': 1,
+        't': 'INTERACTION_CREATE',
+        'd': {
+            'id': '555',
+            'application_id': '5',
+            'type': 3,
+            'version': 1,
+            'token': 'interaction-token',
+            'guild_id': str(guild_id),
+            'channel_id': '20',
+            'member': {
+                'user': {'id': str(member_id), 'username': 'user', 'discriminator': '0001', 'avatar': None},
+                'roles': [],
+                'joined_at': '2021-06-01T00:00:00.000000+00:00',
+                'deaf': False,
+                'mute': False,
+            },
+            'data': {'custom_id': custom_id, 'component_type': 2},
+            'message': dict(MESSAGE_TEMPLATE, id=str(message_id), components=components_payload(rows, per_row)),
+        }
+    }
@@ -1,6 +1,23 @@
 from .components import *
 from .handler import *
 from .interact import *
+from .router import *
+from .guilds import *
+from .cache import *
+from .deadline import *
+from .coalesce import *
+from .uploads import *
+from .ratelimit import *
+from .ids import *
+from .registry import *
+from .metrics import *
+from .transport import *
+from .workers import *
+from .server import *
+from .serialization import *
+from .sessions import *
+from .throttle import *
+from .recording import *
 from .exceptions import *
 
 def create_action_row(components=None):
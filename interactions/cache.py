@@ -0,0 +1,88 @@
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """A bounded mapping that evicts the least recently used key once `maxsize` is reached.
+    Entries older than `ttl` seconds are treated as missing."""
+
+    def __init__(self, maxsize=1000, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict() #key -> (expires_at, value)
+
+
+    def __len__(self):
+        return len(self._data)
+
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+
+    def get(self, key, default=None):
+        try:
+            expires_at, value = self._data[key]
+        except KeyError:
+            return default
+
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        self._data[key] = (time.monotonic() + ttl if ttl is not None else None, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+    def pop(self, key, default=None):
+        try:
+            return self._data.pop(key)[1]
+        except KeyError:
+            return default
+
+
+    def clear(self):
+        self._data.clear()
+
+
+
+class MessageCache:
+    """Parsed `ComponentMessage`s keyed by message id, reused for as long as
+    the `edited_timestamp` in interaction payloads stays the same."""
+
+    def __init__(self, maxsize=1000):
+        self._cache = LRUCache(maxsize)
+
+
+    def __len__(self):
+        return len(self._cache)
+
+
+    def get(self, message_id, edited_timestamp):
+        entry = self._cache.get(message_id)
+        if entry is None or entry[0] != edited_timestamp:
+            return None
+        return entry[1]
+
+
+    def set(self, message_id, edited_timestamp, message):
+        self._cache.set(message_id, (edited_timestamp, message))
+
+
+    def invalidate(self, message_id):
+        self._cache.pop(message_id)
+
+
+    def clear(self):
+        self._cache.clear()
@@ -0,0 +1,73 @@
+import asyncio
+
+
+class _PendingEdit:
+    __slots__ = ('send', 'fields', 'futures')
+
+    def __init__(self, send):
+        self.send = send
+        self.fields = {}
+        self.futures = []
+
+
+class EditCoalescer:
+    """Merges edits to the same message so only the latest fields get sent.
+
+    The first edit for a key goes out straight away. Edits made while it is in flight,
+    or within `interval` seconds after it was sent, are merged and sent together afterwards.
+    Every caller gets the result of the request that included its edit."""
+
+    def __init__(self, bot, interval=1.0):
+        self.bot = bot
+        self.interval = interval
+        self._pending = {}
+        self._workers = {}
+
+
+    def __len__(self):
+        return len(self._pending)
+
+
+    async def submit(self, key, send, **fields):
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _PendingEdit(send)
+
+        pending.send = send
+        pending.fields.update(fields)
+        future = self.bot.loop.create_future()
+        pending.futures.append(future)
+
+        if key not in self._workers:
+            self._workers[key] = self.bot.loop.create_task(self._run(key))
+
+        return await future
+
+
+    async def _run(self, key):
+        loop = self.bot.loop
+
+        try:
+            while True:
+                pending = self._pending.pop(key, None)
+                if pending is None:
+                    return
+
+                started = loop.time()
+
+                try:
+                    result = await pending.send(**pending.fields)
+                except Exception as e:
+                    for future in pending.futures:
+                        if not future.done():
+                            future.set_exception(e)
+                else:
+                    for future in pending.futures:
+                        if not future.done():
+                            future.set_result(result)
+
+                delay = self.interval - (loop.time() - started)
+                if delay > 0 and key in self._pending:
+                    await asyncio.sleep(delay)
+        finally:
+            del self._workers[key]
@@ -1,7 +1,8 @@
 from .exceptions import TooManyComponents, SelectOnly
 from discord.ext import commands
 from enum import IntEnum
-from secrets import token_hex
+from .ids import generate_custom_id
+from .serialization import dumps_bytes
 
 
 class Utils:
@@ -36,66 +37,52 @@ class Utils:
 
     @staticmethod
     def create_button(bt):
-        if isinstance(bt.get('emoji'), dict):
-            emoji = Utils.dict_to_emoji(bt)
-        else:
-            emoji = bt.get('emoji')
-
-        return Button(
-            bt.get('style'),
-            bt.get('label'),
-            emoji,
-            bt.get('custom_id'),
-            bt.get('url'),
-            bt.get('disabled', False)
-        )
+        return Button._from_data(bt)
 
     
     @staticmethod
     def create_dropdown(dd):
-        return SelectMenu(
-            dd.get('custom_id'),
-            [Utils.create_select_option(opt) for opt in dd.get('options', [])],
-            dd.get('placeholder'),
-            dd.get('min_values'),
-            dd.get('max_values')
-        )
+        return SelectMenu._from_data(dd)
 
 
     @staticmethod
     def create_select_option(opt):
-        if isinstance(opt.get('emoji'), dict):
-            emoji = Utils.dict_to_emoji(opt)
-        else:
-            emoji = opt.get('emoji')
-        return MenuOption(
-            opt.get('label'),
-            opt.get('value'),
-            opt.get('description'),
-            emoji,
-            opt.get('default', False)
-        )
+        return MenuOption._from_data(opt)
+
+
+    @staticmethod
+    def copy_components(rows):
+        return [row._copy() for row in rows]
 
 
     @staticmethod
     def parse_components(payload_components):
         rows = []
 
-        for action_row in payload_components:
+        for action_row in payload_components or ():
             comps = []
 
-            for component in action_row['components']:
-                if component['type'] == 2:
-                    comps.append(Utils.create_button(component))
-                if component['type'] == 3:
-                    comps.append(Utils.create_dropdown(component))
+            for component in action_row.get('components', ()):
+                parser = _PARSERS.get(component.get('type'))
+                if parser is not None: #unknown component types are skipped
+                    comps.append(parser(component))
 
             rows.append(ActionRow(comps))
 
         return rows
 
 
+def _copy_slots(obj):
+    new = obj.__class__.__new__(obj.__class__)
+    for cls in type(obj).__mro__:
+        for slot in getattr(cls, '__slots__', ()):
+            setattr(new, slot, getattr(obj, slot))
+    return new
+
+
 class ComponentEmoji:
+    __slots__ = ('id', 'name', 'animated')
+
     def __init__(self, id_, name, animated):
         self.id = id_
         self.name = name
@@ -108,12 +95,20 @@ class ComponentEmoji:
 
 
 class Component:
+    __slots__ = ('custom_id', 'disabled')
+
     def __init__(self, custom_id, disabled):
-        self.custom_id = custom_id or token_hex(50)
+        self.custom_id = custom_id or generate_custom_id()
         self.disabled = False if disabled is None else disabled
 
 
+    def _copy(self):
+        return _copy_slots(self)
+
+
 class MenuOption:
+    __slots__ = ('label', 'value', 'description', 'emoji', 'default')
+
     def __init__(self, label, value, description=None, emoji=None, default=False):
         self.label = label
         self.value = value
@@ -122,21 +117,43 @@ class MenuOption:
         self.default = default
 
 
+    @classmethod
+    def _from_data(cls, data):
+        self = cls.__new__(cls)
+        self.label = data.get('label')
+        self.value = data.get('value')
+        self.description = data.get('description')
+        emoji = data.get('emoji')
+        self.emoji = Utils.dict_to_emoji(data) if isinstance(emoji, dict) else emoji
+        self.default = data.get('default', False)
+        return self
+
+
+    def _copy(self):
+        return _copy_slots(self)
+
+
     def __repr__(self):
         return f'<MenuOption label={self.label}, value={self.value}, description={self.description}, default={self.default}>'
 
 
     def to_dict(self):
-        return {
+        data = {
             'label': self.label,
             'value': self.value,
             'description': self.description,
-            'emoji': Utils.emoji_to_dict(self.emoji),
             'default': self.default
         }
 
+        if self.emoji:
+            data['emoji'] = Utils.emoji_to_dict(self.emoji)
+
+        return data
+
 
 class SelectMenu(Component):
+    __slots__ = ('options', 'placeholder', 'min_values', 'max_values')
+
     def __init__(self, custom_id=None, options=None, placeholder=None, min_values=None, max_values=None, disabled=None):
         super().__init__(custom_id, disabled)
         self.options = options or []
@@ -145,6 +162,24 @@ class SelectMenu(Component):
         self.max_values = max_values or 1
 
 
+    @classmethod
+    def _from_data(cls, data):
+        self = cls.__new__(cls)
+        self.custom_id = data.get('custom_id')
+        self.disabled = data.get('disabled', False)
+        self.options = [MenuOption._from_data(opt) for opt in data.get('options', ())]
+        self.placeholder = data.get('placeholder')
+        self.min_values = data.get('min_values') or 1
+        self.max_values = data.get('max_values') or 1
+        return self
+
+
+    def _copy(self):
+        new = _copy_slots(self)
+        new.options = [opt._copy() for opt in self.options]
+        return new
+
+
     def __repr__(self):
         return f'<SelectMenu placeholder={self.placeholder}, {len(self.options)} options, disabled={self.disabled}>'
 
@@ -183,6 +218,8 @@ class ButtonType(IntEnum):
 
 
 class Button(Component):
+    __slots__ = ('style', 'label', 'emoji', 'url')
+
     def __init__(self, style, label, emoji=None, custom_id=None, url=None, disabled=False):
         super().__init__(custom_id, disabled)
         self.style = style
@@ -191,6 +228,20 @@ class Button(Component):
         self.url = url
 
 
+    @classmethod
+    def _from_data(cls, data):
+        #link buttons don't have a custom_id, so one isn't generated for them here
+        self = cls.__new__(cls)
+        self.custom_id = data.get('custom_id')
+        self.disabled = data.get('disabled', False)
+        self.style = data.get('style')
+        self.label = data.get('label')
+        emoji = data.get('emoji')
+        self.emoji = Utils.dict_to_emoji(data) if isinstance(emoji, dict) else emoji
+        self.url = data.get('url')
+        return self
+
+
     def __repr__(self):
         return f'<Button label={self.label}, style={self.style}, disabled={self.disabled}>'
 
@@ -200,11 +251,13 @@ class Button(Component):
             "type": 2,
             "label": self.label,
             "style": self.style,
-            "emoji": Utils.emoji_to_dict(self.emoji),
             "disabled": self.disabled
         }
 
-        if self.style is not ButtonType.Link:
+        if self.emoji:
+            base_dict['emoji'] = Utils.emoji_to_dict(self.emoji)
+
+        if self.style != ButtonType.Link:
             base_dict['custom_id'] = self.custom_id
             return base_dict
 
@@ -213,11 +266,17 @@ class Button(Component):
 
 
 class ActionRow:
+    __slots__ = ('components', 'buttons')
+
     def __init__(self, components=None):
         self.components = components or []
         self.buttons = components #backwards compat
 
 
+    def _copy(self):
+        return ActionRow([component._copy() for component in self.components])
+
+
     def __repr__(self):
         return f'ActionRow with {len(self.components)} components.'
     
@@ -241,3 +300,72 @@ class ActionRow:
             "type": 1,
             "components": [comp.to_dict() for comp in self.components]
         }
+
+
+
+_PARSERS = {
+    2: Button._from_data,
+    3: SelectMenu._from_data,
+}
+
+
+class FrozenLayout:
+    """An immutable set of ActionRows which is serialized once and reused for every send.
+    Can be passed anywhere a list of ActionRows is accepted as `components`."""
+
+    __slots__ = ('_rows', '_json', '_variants')
+
+    def __init__(self, rows):
+        self._rows = tuple(row if isinstance(row, dict) else row.to_dict() for row in rows)
+        self._json = dumps_bytes(self._rows)
+        self._variants = {}
+
+
+    def __repr__(self):
+        return f'<FrozenLayout {len(self._rows)} rows, {len(self._json)} bytes>'
+
+
+    def __len__(self):
+        return len(self._rows)
+
+
+    def to_list(self):
+        """The serialized rows. These are shared between sends so they must not be modified."""
+        return list(self._rows)
+
+
+    def to_json(self):
+        return self._json
+
+
+    def with_overrides(self, overrides=None, **defaults):
+        """Returns a layout with some fields changed, e.g. `layout.with_overrides({'next': {'disabled': True}})`
+        or `layout.with_overrides(disabled=True)` for every component. Keys of `overrides` are custom_ids.
+        Only the changed components are copied and each distinct set of overrides is built once."""
+
+        overrides = overrides or {}
+        try:
+            #encoded rather than hashed, since override values can be dicts or lists like an emoji
+            key = (dumps_bytes(overrides), dumps_bytes(defaults))
+        except TypeError:
+            key = None #not JSON serializable, so it can't be cached (or sent) as is
+
+        layout = self._variants.get(key) if key is not None else None
+        if layout is not None:
+            return layout
+
+        rows = []
+        for row in self._rows:
+            comps = []
+            for comp in row['components']:
+                fields = overrides.get(comp.get('custom_id'))
+                if defaults or fields:
+                    comp = {**comp, **defaults, **(fields or {})}
+                comps.append(comp)
+            rows.append({'type': 1, 'components': comps})
+
+        layout = FrozenLayout(rows)
+        if key is not None and len(self._variants) < 64:
+            self._variants[key] = layout
+
+        return layout
@@ -0,0 +1,102 @@
+import heapq
+import itertools
+import time
+from collections import deque
+
+
+class DeferralScheduler:
+    """Defers interactions automatically shortly before Discord's 3 second callback window runs out.
+
+    Interactions are deferred as an update (type 6), which shows nothing to the user, and handlers don't need to know
+    it happened: `InteractionResponse.respond` is sent as a follow-up that keeps its own `ephemeral` flag and
+    `InteractionResponse.edit_original` still edits the component message."""
+
+    def __init__(self, bot, deadline=3.0, margin=0.5, history=1000):
+        self.bot = bot
+        self.deadline = deadline
+        self.margin = margin
+        self.scheduled = 0
+        self.auto_deferred = 0
+        self.failed = 0
+        self.latencies = deque(maxlen=history) #seconds between receiving an interaction and the handler's first response
+        self._heap = []
+        self._counter = itertools.count()
+        self._timer = None
+
+
+    def __len__(self):
+        return len(self._heap)
+
+
+    def schedule(self, resp):
+        fire_at = resp._received_at + self.deadline - self.margin
+        heapq.heappush(self._heap, (fire_at, next(self._counter), resp))
+        self.scheduled += 1
+
+        if self._timer is None:
+            self._arm()
+
+
+    def _arm(self):
+        fire_at = self._heap[0][0]
+        delay = max(0, fire_at - time.monotonic())
+        self._timer = self.bot.loop.call_later(delay, self._run)
+
+
+    def _run(self):
+        self._timer = None
+        now = time.monotonic()
+        heap = self._heap
+
+        while heap and heap[0][0] <= now:
+            _, _, resp = heapq.heappop(heap)
+
+            #_responded_at is set as soon as a response starts, _responded only once its request has returned
+            if resp._responded or resp._deferred or resp._acknowledged_update or resp._responded_at is not None:
+                if resp._responded_at is not None:
+                    self.latencies.append(resp._responded_at - resp._received_at)
+                continue
+
+            resp._acknowledged_update = True
+            resp._auto_deferral = self.bot.loop.create_task(self._defer(resp))
+            self.auto_deferred += 1
+            if self.bot.handler.handler.metrics is not None:
+                self.bot.handler.handler.metrics.increment('interactions_deferrals_total', {'auto': 'true'})
+
+        if heap:
+            self._arm()
+
+
+    async def _defer(self, resp):
+        try:
+            await self.bot.handler.handler.defer(
+                resp.interaction_id,
+                resp.interaction_token,
+                False,
+                True
+            )
+        except Exception:
+            self.failed += 1
+            resp._acknowledged_update = False #so the handler's response is still sent as the initial callback
+
+
+    def stats(self):
+        """How close handlers are getting to the deadline.
+        Latencies only cover interactions that were responded to before being auto-deferred."""
+
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else None
+
+        return {
+            'scheduled': self.scheduled,
+            'pending': len(self._heap),
+            'auto_deferred': self.auto_deferred,
+            'failed': self.failed,
+            'p50': percentile(0.5),
+            'p95': percentile(0.95),
+            'p99': percentile(0.99),
+            'max': latencies[-1] if latencies else None,
+            'min_headroom': self.deadline - latencies[-1] if latencies else None,
+        }
@@ -2,4 +2,7 @@ class TooManyComponents(Exception):
     pass
 
 class SelectOnly(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class CustomIdTooLong(Exception):
+    pass
@@ -0,0 +1,87 @@
+import asyncio
+import discord
+from .cache import LRUCache
+
+
+class PartialGuild(discord.Object):
+    """Stand-in for a guild that isn't cached yet, built from the interaction payload alone.
+
+    Members built against it work, but without the guild's roles or owner: `member.roles` and `member.top_role`
+    only have the @everyone role (with no permissions) and `member.guild_permissions` is empty unless it's the owner,
+    which is never known. The real guild is used for interactions once `GuildResolver` has fetched it."""
+
+    def __init__(self, id, locale=None, state=None):
+        super().__init__(id)
+        self.locale = locale
+        self.owner_id = None
+        self.roles = []
+        self._state = state
+        self._default_role = None
+
+
+    @property
+    def default_role(self):
+        if self._default_role is None:
+            self._default_role = discord.Role(guild=self, state=self._state, data={'id': self.id, 'name': '@everyone', 'permissions': 0})
+        return self._default_role
+
+
+    def get_role(self, role_id):
+        return self.default_role if role_id == self.id else None
+
+
+    def get_member(self, user_id):
+        return None
+
+
+    def __repr__(self):
+        return f'<PartialGuild id={self.id}>'
+
+
+class GuildResolver:
+    """Resolves guilds for interactions without awaiting the API.
+
+    Guilds missing from the bot's cache are returned as a `PartialGuild` straight away
+    while a single background `fetch_guild` per guild id fills a bounded TTL cache."""
+
+    def __init__(self, bot, maxsize=1000, ttl=600, fetch_missing=True):
+        self.bot = bot
+        self.fetch_missing = fetch_missing
+        self.cache = LRUCache(maxsize, ttl)
+        self._pending = {}
+
+
+    def resolve(self, guild_id, data=None):
+        guild = self.bot.get_guild(guild_id) or self.cache.get(guild_id)
+        if guild is not None:
+            return guild
+
+        if self.fetch_missing and guild_id not in self._pending:
+            self._start_fetch(guild_id)
+
+        return PartialGuild(guild_id, data.get('guild_locale') if data else None, self.bot._connection)
+
+
+    async def fetch(self, guild_id):
+        guild = self.bot.get_guild(guild_id) or self.cache.get(guild_id)
+        if guild is not None:
+            return guild
+
+        task = self._pending.get(guild_id) or self._start_fetch(guild_id)
+        return await asyncio.shield(task)
+
+
+    def _start_fetch(self, guild_id):
+        task = self.bot.loop.create_task(self.bot.fetch_guild(guild_id))
+        self._pending[guild_id] = task
+        task.add_done_callback(lambda t: self._fetched(guild_id, t))
+        return task
+
+
+    def _fetched(self, guild_id, task):
+        self._pending.pop(guild_id, None)
+
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        self.cache.set(guild_id, task.result())
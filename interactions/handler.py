@@ -1,11 +1,229 @@
+import asyncio
+import copy
 import discord
-from .components import Utils
-from aiohttp import ClientSession, FormData
-from json import dumps
+import functools
+from .components import Utils, FrozenLayout
+from .cache import LRUCache, MessageCache
+from .coalesce import EditCoalescer
+from .uploads import FileUpload
+from .ratelimit import RequestScheduler
+from .serialization import dumps_bytes
+from aiohttp.payload import BytesPayload
+import secrets
+import time
+
+_MISSING = object()
+_LAYOUT_PLACEHOLDER = f'frozen-layout:{secrets.token_hex(8)}:' #random so message content can't collide with it
+
+
+def encode_json(obj):
+    """Serializes a request body to bytes with the configured JSON backend,
+    splicing in the cached JSON of any `FrozenLayout`s rather than re-encoding them."""
+    layouts = []
+
+    def default(o):
+        if not isinstance(o, FrozenLayout):
+            raise TypeError(f'Object of type {o.__class__.__name__} is not JSON serializable')
+        layouts.append(o)
+        return f'{_LAYOUT_PLACEHOLDER}{len(layouts) - 1}'
+
+    body = dumps_bytes(obj, default)
+    for i, layout in enumerate(layouts):
+        body = body.replace(f'"{_LAYOUT_PLACEHOLDER}{i}"'.encode('utf-8'), layout.to_json(), 1)
+
+    return body
+
+
+def json_payload(obj):
+    return BytesPayload(encode_json(obj), content_type='application/json')
+
 
 class InteractionsHandler:
     def __init__(self, bot):
         self.bot = bot
+        self._am_source = _MISSING
+        self._am_dict = None
+        self._webhook_user_id = None
+        self._webhook_base = None
+        self._routes = LRUCache(1024)
+        self.coalescer = EditCoalescer(bot)
+        self.scheduler = RequestScheduler(bot)
+        self.transport = None
+        self._http_callbacks = {} #interaction token -> future for the HTTP response body of an InteractionServer request
+        self.metrics = None
+        self.message_cache = MessageCache()
+        self.edit_hashes = LRUCache(4096) #message id -> [hash of the last edit sent, its edited_timestamp]
+        self._original_ids = LRUCache(4096, ttl=900) #interaction token -> id of its @original, once an edit has returned it
+
+
+    def invalidate(self):
+        """Drops the cached allowed mentions and routes.
+        Only needed if `bot.allowed_mentions` is changed in place rather than reassigned."""
+
+        self._am_source = _MISSING
+        self._webhook_user_id = None
+        self._routes.clear()
+
+
+    def _allowed_mentions(self, allowed_mentions=None):
+        default = self.bot._connection.allowed_mentions
+
+        if allowed_mentions is not None:
+            if default is not None:
+                return default.merge(allowed_mentions).to_dict()
+            return allowed_mentions.to_dict()
+
+        if default is not self._am_source:
+            self._am_source = default
+            self._am_dict = default.to_dict() if default is not None else {}
+
+        return self._am_dict
+
+
+    def use_transport(self, transport):
+        """Sends interaction callbacks and webhook requests through `transport` (an `InteractionTransport`)
+        instead of `bot.http`. Pass `None` to go back to `bot.http`."""
+
+        self.transport = transport
+        if transport is not None and self.scheduler is not None:
+            transport.on_response = self.scheduler.observe
+
+
+    def _request(self, route, **kwargs):
+        send = self.bot.http.request
+        if self.transport is not None and self.transport.handles(route):
+            send = self.transport.request
+
+        if self.scheduler is not None:
+            kwargs['send'] = send
+            send = self.scheduler.request
+
+        if self.metrics is None:
+            return send(route, **kwargs)
+        return self.metrics.time_request(send, route, kwargs)
+
+
+    def capture_callback(self, interaction_token):
+        """Returns a future that gets the encoded body of the interaction's initial callback
+        instead of it being POSTed, so it can be sent back as the HTTP response to an outgoing webhook."""
+
+        future = self.bot.loop.create_future()
+        self._http_callbacks[interaction_token] = future
+        return future
+
+
+    def release_callback(self, interaction_token):
+        future = self._http_callbacks.pop(interaction_token, None)
+        if future is not None and not future.done():
+            future.cancel()
+
+
+    async def _callback(self, interaction_id, interaction_token, to_send, files=None):
+        future = self._http_callbacks.pop(interaction_token, None)
+
+        if future is None or future.done():
+            if files:
+                form = self.build_files(to_send, files)
+                await self._request(self._callback_route(interaction_id, interaction_token), form=form, files=files)
+            else:
+                body = to_send if isinstance(to_send, bytes) else encode_json(to_send)
+                await self._request(self._callback_route(interaction_id, interaction_token), data=BytesPayload(body, content_type='application/json'))
+            return
+
+        if not files:
+            future.set_result(to_send if isinstance(to_send, bytes) else encode_json(to_send))
+            return
+
+        #an HTTP response body can't carry attachments, so acknowledge with a deferral and upload them into @original
+        data = to_send['data']
+        future.set_result(encode_json({'type': 5, 'data': {'flags': 64}} if data.get('flags') else {'type': 5}))
+        form = self.build_files(data, files)
+        await self._request(self._webhook_route('PATCH', interaction_token, '/messages/@original'), form=form, files=files)
+
+
+    def _route(self, method, path):
+        key = (method, path)
+        route = self._routes.get(key)
+        if route is None:
+            route = discord.http.Route(method, path)
+            self._routes.set(key, route)
+        return route
+
+
+    def _callback_route(self, interaction_id, interaction_token):
+        return discord.http.Route('POST', f'/interactions/{interaction_id}/{interaction_token}/callback')
+
+
+    def _webhook_route(self, method, interaction_token, suffix=''):
+        user_id = self.bot.user.id
+        if user_id != self._webhook_user_id:
+            self._webhook_user_id = user_id
+            self._webhook_base = f'/webhooks/{user_id}/'
+        return discord.http.Route(method, self._webhook_base + interaction_token + suffix)
+
+
+    def component_message(self, msg_dict, channel):
+        """Returns the parsed message for an interaction payload's `message`, reusing a cached one if it hasn't been edited since.
+        Every call gets its own copy of the message and its components, so changing them in one click's handler doesn't
+        leak into the next."""
+        if self.message_cache is None:
+            return ComponentMessage(state=self.bot._connection, channel=channel, data=msg_dict)
+
+        message_id = int(msg_dict['id'])
+        edited_timestamp = msg_dict.get('edited_timestamp')
+        message = self.message_cache.get(message_id, edited_timestamp)
+
+        if message is None:
+            message = ComponentMessage(state=self.bot._connection, channel=channel, data=msg_dict)
+            self.message_cache.set(message_id, edited_timestamp, message)
+
+        return message._copy()
+
+
+    def invalidate_message(self, message_id):
+        if self.message_cache is not None:
+            self.message_cache.invalidate(message_id)
+
+
+    def _edit_digest(self, key, body):
+        """Returns the hash of an edit's encoded body, or `None` if it's identical to the last edit sent for `key`."""
+        digest = hash(body)
+        last = self.edit_hashes.get(key) if self.edit_hashes is not None else None
+        if last is not None and last[0] == digest:
+            if self.metrics is not None:
+                self.metrics.increment('interactions_edits_skipped_total')
+            return None
+        return digest
+
+
+    def _edited(self, key, digest, data=None):
+        if self.edit_hashes is not None:
+            edited_timestamp = data.get('edited_timestamp') if isinstance(data, dict) else None
+            self.edit_hashes.set(key, [digest, edited_timestamp])
+
+
+    def message_edited(self, message_id, edited_timestamp):
+        """Called for every MESSAGE_UPDATE. Forgets the last edit sent for the message if it has since been edited by
+        anything else, going by the `edited_timestamp` of our own edit. Edits sent as an interaction callback don't return
+        one, so the first update after them is taken to be theirs."""
+
+        if self.edit_hashes is None or edited_timestamp is None:
+            return
+
+        last = self.edit_hashes.get(message_id)
+        if last is None:
+            return
+
+        if last[1] is None:
+            last[1] = edited_timestamp
+        elif last[1] != edited_timestamp:
+            self.edit_hashes.pop(message_id)
+
+
+    def forget_edit(self, key):
+        """Makes the next edit of a message id or interaction token go through even if it looks unchanged."""
+        if self.edit_hashes is not None:
+            self.edit_hashes.pop(self._original_ids.get(key, key))
 
 
     def _build_component_message(self, partial_msg, channel_id):
@@ -14,29 +232,34 @@ class InteractionsHandler:
 
 
     def build_files(self, data, files):
-        form = FormData()
-        form.add_field('payload_json', dumps(data, separators=(',', ':'), ensure_ascii=True))
+        """Returns the multipart fields as `form=` params for `bot.http.request`,
+        which rebuilds the form for every retry while the file uploads themselves are reused."""
+
+        form = [{'name': 'payload_json', 'value': encode_json(data).decode('utf-8')}]
         for i, f in enumerate(files):
-            form.add_field(
-                f'file{i}',
-                f.fp,
-                filename = f.filename,
-                content_type = 'application/octet-stream',
-            )
+            form.append({
+                'name': f'file{i}',
+                'value': FileUpload(f),
+                'filename': f.filename,
+                'content_type': 'application/octet-stream',
+            })
 
         return form
 
 
     def build_msg(self, content, components, embeds=[], reply_to=None, mention_author=None, tts=None, ephemeral=None, allowed_mentions=None):
-        allowed_mentions = ComponentsHandler._get_am(self.bot, {'allowed_mentions': allowed_mentions})
+        allowed_mentions = self._allowed_mentions(allowed_mentions)
 
         data = {
             "content": content,
-            "components": [comp.to_dict() for comp in components] if isinstance(components, list) else [],
-            "tts": tts,
-            "flags": 64 if ephemeral else None,
+            "components": components if isinstance(components, FrozenLayout) else [comp.to_dict() for comp in components] if isinstance(components, list) else [],
         }
 
+        if tts is not None:
+            data["tts"] = tts
+        if ephemeral:
+            data["flags"] = 64
+
         if embeds is None:
             data["embeds"] = []
         
@@ -54,7 +277,7 @@ class InteractionsHandler:
             }
             if mention_author is None:
                 mention_author = True
-            allowed_mentions['replied_user'] = mention_author
+            allowed_mentions = dict(allowed_mentions, replied_user=mention_author)
 
         data['allowed_mentions'] = allowed_mentions
 
@@ -76,17 +299,13 @@ class InteractionsHandler:
             )
         }
 
+        await self._callback(interaction_id, interaction_token, to_send, files)
         if files:
-            form = self.build_files(to_send, files)
-            await self.bot.http.request(discord.http.Route('POST', f'/interactions/{interaction_id}/{interaction_token}/callback'), data=form, files=files)
             for f in files:
                 f.close()
 
-        else:
-            await self.bot.http.request(discord.http.Route('POST', f'/interactions/{interaction_id}/{interaction_token}/callback'), json=to_send)
-
 
-    async def follow_up(self, channel_id, interaction_id, interaction_token, content, components, embeds, tts, ephemeral):
+    async def follow_up(self, channel_id, interaction_id, interaction_token, content, components, embeds, tts, ephemeral, files=None):
         to_send = self.build_msg(
             content,
             components,
@@ -95,10 +314,17 @@ class InteractionsHandler:
             ephemeral = ephemeral
         )
 
-        partial_msg = await self.bot.http.request(
-            discord.http.Route('POST', f'/webhooks/{self.bot.user.id}/{interaction_token}'),
-            json = to_send
-        )
+        if files:
+            form = self.build_files(to_send, files)
+            partial_msg = await self._request(self._webhook_route('POST', interaction_token), form=form, files=files)
+            for f in files:
+                f.close()
+
+        else:
+            partial_msg = await self._request(
+                self._webhook_route('POST', interaction_token),
+                data = json_payload(to_send)
+            )
 
         return self._build_component_message(partial_msg, channel_id)
 
@@ -116,12 +342,12 @@ class InteractionsHandler:
 
         if files:
             form = self.build_files(to_send, files)
-            partial_msg = await self.bot.http.request(discord.http.Route('POST', f'/channels/{channel.id}/messages'), data=form, files=files)
+            partial_msg = await self._request(self._route('POST', f'/channels/{channel.id}/messages'), form=form, files=files)
             for f in files:
                 f.close()
 
         else:
-            partial_msg = await self.bot.http.request(discord.http.Route('POST', f'/channels/{channel.id}/messages'), json=to_send)
+            partial_msg = await self._request(self._route('POST', f'/channels/{channel.id}/messages'), data=json_payload(to_send))
 
         return self._build_component_message(partial_msg, channel.id)
 
@@ -129,81 +355,229 @@ class InteractionsHandler:
     async def defer(self, interaction_id, interaction_token, ephemeral, edit_original):
         to_send = {
             "type": 5 if not edit_original else 6,
-            "data": {
-                "flags": 64 if ephemeral else None
-            }
         }
 
-        await self.bot.http.request(
-            discord.http.Route('POST', f'/interactions/{interaction_id}/{interaction_token}/callback'),
-            json = to_send
-        )
+        if ephemeral:
+            to_send["data"] = {"flags": 64}
+
+        await self._callback(interaction_id, interaction_token, to_send)
+
+
+    def acknowledge(self, interaction_id, interaction_token):
+        """Acknowledges an interaction with a bare deferred update (type 6) without building an `InteractionResponse`."""
+        future = self._http_callbacks.pop(interaction_token, None)
+        if future is not None and not future.done():
+            future.set_result(b'{"type":6}')
+            return
+
+        self.bot.loop.create_task(self._acknowledge(interaction_id, interaction_token))
 
 
-    async def edit_response(self, channel_id, interaction_token, content, components, embeds, files):
+    async def _acknowledge(self, interaction_id, interaction_token):
+        try:
+            await self._callback(interaction_id, interaction_token, b'{"type":6}')
+        except discord.HTTPException:
+            pass #e.g. the interaction token already expired
+        except Exception:
+            await self.bot.on_error('interaction_acknowledge', interaction_id)
+
+
+    async def edit_response(self, channel_id, interaction_token, content, components, embeds, files, message_id=None, followup_id=None):
+        """Edits @original, or the follow-up `followup_id`. Returns `None` without sending anything if it's identical to the last edit.
+        Pass `message_id` when @original is the component message, i.e. after a deferred update."""
+
         to_send = self.build_msg(
                 content,
                 components,
                 embeds,
         )
+        #keyed by message id, so MESSAGE_UPDATEs and edits of the same message through other routes affect the same entry
+        key = followup_id or message_id or self._original_ids.get(interaction_token)
+        suffix = f'/messages/{followup_id}' if followup_id else '/messages/@original'
 
         if files is not None:
             if not isinstance(files, list):
                 files = [files]
 
         if files:
+            self.forget_edit(key)
             form = self.build_files(to_send, files)
-            partial_msg = await self.bot.http.request(discord.http.Route('PATCH', f'/webhooks/{self.bot.user.id}/{interaction_token}/messages/@original'), data=form, files=files)
+            partial_msg = await self._request(self._webhook_route('PATCH', interaction_token, suffix), form=form, files=files)
             for f in files:
                 f.close()
 
         else:
-            partial_msg = await self.bot.http.request(discord.http.Route('PATCH', f'/webhooks/{self.bot.user.id}/{interaction_token}/messages/@original'), json=to_send)
+            body = encode_json(to_send)
+            digest = self._edit_digest(key, body)
+            if digest is None:
+                return None
+            partial_msg = await self._request(
+                self._webhook_route('PATCH', interaction_token, suffix),
+                data=BytesPayload(body, content_type='application/json')
+            )
+            if key is None and isinstance(partial_msg, dict):
+                key = int(partial_msg['id'])
+                self._original_ids.set(interaction_token, key)
+            if key is not None:
+                self._edited(key, digest, partial_msg)
 
         return self._build_component_message(partial_msg, channel_id)
 
 
-    async def delete_response(self, interaction_token):
-        await self.bot.http.request(
-            discord.http.Route('DELETE', f'/webhooks/{self.bot.user.id}/{interaction_token}/messages/@original'),
+    async def delete_response(self, interaction_token, followup_id=None):
+        self.forget_edit(followup_id or interaction_token)
+        if followup_id is None:
+            self._original_ids.pop(interaction_token)
+        await self._request(
+            self._webhook_route('DELETE', interaction_token, f'/messages/{followup_id}' if followup_id else '/messages/@original'),
         )
 
 
-    async def edit_original(self, interaction_id, interaction_token, content, embeds, components, mention_author):
-        to_send = {
-            "type": 7,
-            "data": self.build_msg(
-                content,
-                components,
-                embeds
-            )
-        }
+    async def edit_original(self, interaction_id, interaction_token, content, embeds, components, mention_author, message_id=None):
+        """Updates the component message as the interaction's response. If `message_id` is passed and the
+        message would be identical to the last edit sent for it, the interaction is only acknowledged."""
 
-        await self.bot.http.request(
-            discord.http.Route('POST', f'/interactions/{interaction_id}/{interaction_token}/callback'),
-            json = to_send
-        )
+        body = encode_json(self.build_msg(
+            content,
+            components,
+            embeds
+        ))
+
+        digest = None if message_id is None else self._edit_digest(message_id, body)
+        if message_id is not None and digest is None:
+            await self._callback(interaction_id, interaction_token, b'{"type":6}')
+            return
+
+        await self._callback(interaction_id, interaction_token, b'{"type":7,"data":' + body + b'}')
+        if digest is not None:
+            self._edited(message_id, digest)
 
 
-    async def edit_message(self, channel_id, message_id, content, embeds, components):
+    async def edit_message(self, channel_id, message_id, content, embeds, components, coalesce=False):
         to_send = self.build_msg(
             content,
             components,
             embeds
         )
 
-        await self.bot.http.request(
-            discord.http.Route('PATCH', f'/channels/{channel_id}/messages/{message_id}'),
-            json = to_send
-        )
+        if coalesce:
+            return await self.coalescer.submit((channel_id, message_id), self._patch_message(channel_id, message_id), **to_send)
+
+        return await self._patch_message(channel_id, message_id)(**to_send)
+
+
+    def _patch_message(self, channel_id, message_id):
+        async def send(**fields):
+            body = encode_json(fields)
+            digest = self._edit_digest(message_id, body)
+            if digest is None:
+                return None
+
+            self.invalidate_message(message_id)
+            data = await self._request(
+                discord.http.Route('PATCH', f'/channels/{channel_id}/messages/{message_id}'),
+                data = BytesPayload(body, content_type='application/json')
+            )
+            self._edited(message_id, digest, data)
+            return data
+
+        return send
 
 
     async def delete_message(self, channel_id, message_id):
-        await self.bot.http.request(
+        self.invalidate_message(message_id)
+        self.forget_edit(message_id)
+        await self._request(
             discord.http.Route('DELETE', f'/channels/{channel_id}/messages/{message_id}')
         )
 
 
+    async def _run_bulk(self, jobs, concurrency):
+        result = BulkResult()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(targets, job):
+            async with semaphore:
+                try:
+                    failed = await job() or {}
+                except Exception as e:
+                    failed = dict.fromkeys(targets, e)
+
+                for target in targets:
+                    if target in failed:
+                        result.failed[target] = failed[target]
+                    else:
+                        result.succeeded.append(target)
+
+        await asyncio.gather(*(run(targets, job) for targets, job in jobs))
+        return result
+
+
+    async def bulk_edit_messages(self, targets, content, embeds, components, concurrency=5):
+        """Edits every `(channel_id, message_id)` in `targets` the same way, e.g. to disable a menu's components.
+        Failures are collected in the returned `BulkResult` rather than stopping the other edits."""
+
+        def edit(channel_id, message_id):
+            async def job():
+                await self.edit_message(channel_id, message_id, content, embeds, components)
+            return job
+
+        jobs = [([target], edit(*target)) for target in dict.fromkeys(targets)]
+        return await self._run_bulk(jobs, concurrency)
+
+
+    async def bulk_delete_messages(self, targets, concurrency=5):
+        """Deletes every `(channel_id, message_id)` in `targets`. Messages younger than two weeks are deleted
+        up to 100 at a time per channel with the bulk delete endpoint (needs Manage Messages, otherwise they're
+        deleted one by one). Failures are collected in the returned `BulkResult`."""
+
+        channels = {}
+        for channel_id, message_id in dict.fromkeys(targets):
+            channels.setdefault(channel_id, []).append(message_id)
+
+        cutoff = (time.time() - 14 * 24 * 60 * 60 + 60) * 1000 - discord.utils.DISCORD_EPOCH
+        jobs = []
+
+        for channel_id, message_ids in channels.items():
+            recent = [m for m in message_ids if (m >> 22) > cutoff]
+            old = [m for m in message_ids if (m >> 22) <= cutoff]
+
+            for i in range(0, len(recent), 100):
+                chunk = recent[i:i + 100]
+                if len(chunk) == 1:
+                    old.extend(chunk)
+                    continue
+
+                jobs.append(([(channel_id, m) for m in chunk], functools.partial(self._bulk_delete_chunk, channel_id, chunk)))
+
+            for message_id in old:
+                jobs.append(([(channel_id, message_id)], functools.partial(self.delete_message, channel_id, message_id)))
+
+        return await self._run_bulk(jobs, concurrency)
+
+
+    async def _bulk_delete_chunk(self, channel_id, message_ids):
+        try:
+            await self._request(
+                discord.http.Route('POST', f'/channels/{channel_id}/messages/bulk-delete'),
+                data = json_payload({'messages': [str(m) for m in message_ids]})
+            )
+        except discord.Forbidden:
+            #no manage messages, which is fine as long as they're our own messages
+            results = await asyncio.gather(*(self.delete_message(channel_id, m) for m in message_ids), return_exceptions=True)
+            return {(channel_id, m): r for m, r in zip(message_ids, results) if isinstance(r, Exception)}
+
+
+class BulkResult:
+    def __init__(self):
+        self.succeeded = []
+        self.failed = {} #(channel_id, message_id) -> exception
+
+
+    def __repr__(self):
+        return f'<BulkResult {len(self.succeeded)} succeeded, {len(self.failed)} failed>'
+
+
 class PartialMessage:
     def __init__(self, msg_id, flags):
         self.id = msg_id
@@ -235,16 +609,25 @@ class ComponentMessage(discord.Message):
     def _handle_components(self, value):
         self.components = Utils.parse_components(value)
 
+    def _copy(self):
+        message = copy.copy(self)
+        message.components = Utils.copy_components(self.components)
+        message.embeds = list(self.embeds)
+        return message
+
     async def edit(self, **kwargs):
         """Usage of this is exactly the same as discord.py's `Message.edit()`
-        except `embed` has been switched out for `embeds` and a `components` param is supported."""
+        except `embed` has been switched out for `embeds` and a `components` param is supported.
+        Pass `coalesce=True` to merge rapid edits to this message into fewer requests."""
 
         try:
             components = kwargs['components']
         except KeyError:
             pass
         else:
-            if components is not None and components != []:
+            if isinstance(components, FrozenLayout):
+                kwargs['components'] = components.to_list()
+            elif components is not None and components != []:
                 kwargs['components'] = [comp.to_dict() for comp in kwargs['components']]
 
         try:
@@ -273,6 +656,7 @@ class ComponentMessage(discord.Message):
              kwargs['flags'] = flags.value
 
         delete_after = kwargs.pop('delete_after', None)
+        coalesce = kwargs.pop('coalesce', False)
 
         try:
             allowed_mentions = kwargs.pop('allowed_mentions')
@@ -286,9 +670,17 @@ class ComponentMessage(discord.Message):
                     allowed_mentions = allowed_mentions.to_dict()
                 kwargs['allowed_mentions'] = allowed_mentions
 
-        if kwargs:
-            data = await self._state.http.edit_message(self.channel.id, self.id, **kwargs)
-            self._update(data)
+        if kwargs and coalesce:
+            handler = self._state._get_client().handler.handler
+            data = await handler.coalescer.submit((self.channel.id, self.id), handler._patch_message(self.channel.id, self.id), **kwargs)
+            if data is not None:
+                self._update(data)
+
+        elif kwargs:
+            handler = self._state._get_client().handler.handler
+            data = await handler._patch_message(self.channel.id, self.id)(**kwargs)
+            if data is not None:
+                self._update(data)
 
         if delete_after is not None:
             await self.delete(delay=delete_after)
@@ -299,13 +691,15 @@ class InteractionResponse:
     def __init__(self, bot, message, member, member_id, guild, guild_id, channel,
     channel_id, interaction_id, interaction_token, custom_id, values, component_type):
         self._bot = bot
-        self.message = message
-        self.member = member
+        self._data = None
+        self._message = message
+        self._member = member
         self.member_id = member_id
-        self.guild = guild
+        self._guild = guild
         self.guild_id = guild_id
-        self.channel = channel
+        self._channel = channel
         self.channel_id = channel_id
+        self.message_id = message.id
         self.mention = f'<@{self.member_id}>'
         self.interaction_id = interaction_id
         self.interaction_token = interaction_token
@@ -314,9 +708,111 @@ class InteractionResponse:
         self.component_type = component_type
         self._deferred = False
         self._responded = False
+        self._deferred_update = False
+        self._acknowledged_update = False #acknowledged with a type 6 by the library rather than the handler
+        self._auto_deferral = None
+        self._received_at = time.monotonic()
+        self._responded_at = None
+        self._message_edit = None
+
+
+    @classmethod
+    def from_payload(cls, bot, data):
+        """Creates a response straight from an INTERACTION_CREATE payload.
+        `member`, `message`, `guild` and `channel` are only built the first time they're accessed."""
+
+        self = cls.__new__(cls)
+        self._bot = bot
+        self._data = data
+        self._message = self._member = self._guild = self._channel = _MISSING
+        self.member_id = int(data['member']['user']['id'])
+        self.guild_id = int(data['guild_id'])
+        channel_id = data['message'].get('channel_id')
+        self.channel_id = int(channel_id) if channel_id else None
+        self.message_id = int(data['message']['id'])
+        self.mention = f'<@{self.member_id}>'
+        self.interaction_id = int(data['id'])
+        self.interaction_token = data['token']
+        self.custom_id = data['data']['custom_id']
+        self.values = data['data'].get('values')
+        self.component_type = data['data']['component_type']
+        self._deferred = False
+        self._responded = False
+        self._deferred_update = False
+        self._acknowledged_update = False #acknowledged with a type 6 by the library rather than the handler
+        self._auto_deferral = None
+        self._received_at = time.monotonic()
+        self._responded_at = None
+        self._message_edit = None
+        return self
+
+
+    @property
+    def guild(self):
+        if self._guild is _MISSING:
+            self._guild = self._bot.guild_resolver.resolve(self.guild_id, self._data)
+        return self._guild
+
+
+    @guild.setter
+    def guild(self, value):
+        self._guild = value
+
+
+    @property
+    def channel(self):
+        if self._channel is _MISSING:
+            self._channel = self._bot.get_channel(self.channel_id) if self.channel_id else None
+        return self._channel
+
+
+    @channel.setter
+    def channel(self, value):
+        self._channel = value
+
+
+    @property
+    def member(self):
+        if self._member is _MISSING:
+            self._member = discord.Member(data=self._data['member'], guild=self.guild, state=self._bot._connection)
+        return self._member
+
+
+    @member.setter
+    def member(self, value):
+        self._member = value
+
+
+    @property
+    def message(self):
+        if self._message is _MISSING:
+            msg_dict = self._data['message']
+            if len(msg_dict) == 2:
+                self._message = PartialMessage(int(msg_dict['id']), msg_dict['flags'])
+            else:
+                self._message = self._bot.handler.handler.component_message(msg_dict, self.channel)
+            if self._message_edit is not None:
+                self._apply_message_edit()
+        return self._message
+
+
+    @message.setter
+    def message(self, value):
+        self._message = value
+
+
+    async def _wait_auto_deferral(self):
+        if self._auto_deferral is not None:
+            await self._auto_deferral
+        if self._responded_at is None:
+            self._responded_at = time.monotonic()
+            metrics = self._bot.handler.handler.metrics
+            if metrics is not None:
+                metrics.observe('interactions_first_response_seconds', None, self._responded_at - self._received_at)
 
 
     async def respond(self, content=None, embeds=[], reply_to=None, mention_author=False, tts=False, ephemeral=False, files=None, **kwargs):
+        await self._wait_auto_deferral()
 
         if embeds == []:
             if kwargs.get('embed'):
@@ -326,10 +822,10 @@ class InteractionResponse:
             if not isinstance(files, list):
                 files = [files]
 
-        if not self._responded:
+        if not self._responded and not self._acknowledged_update:
             if not self._deferred:
                 components = kwargs.get('components', [])
-                await InteractionsHandler(self._bot).respond(
+                await self._bot.handler.handler.respond(
                     self.interaction_id,
                     self.interaction_token,
                     content,
@@ -344,7 +840,7 @@ class InteractionResponse:
 
             else:
                 components = kwargs.get('components', [])
-                await InteractionsHandler(self._bot).edit_response(
+                await self._bot.handler.handler.edit_response(
                     self.channel_id,
                     self.interaction_token,
                     content,
@@ -356,8 +852,13 @@ class InteractionResponse:
             self._responded = True
             return InteractionMessage(content, embeds, components, ephemeral, self, files, self.interaction_id, self.interaction_token)
 
+        #also the first response after the interaction was acknowledged on the handler's behalf,
+        #since @original is then the component message and a follow-up keeps this response's own flags
         components = kwargs.get('components', [])
-        await InteractionsHandler(self._bot).follow_up(
+        if self._bot.handler.handler.metrics is not None:
+            self._bot.handler.handler.metrics.increment('interactions_follow_ups_total')
+
+        message = await self._bot.handler.handler.follow_up(
             self.channel_id,
             self.interaction_id,
             self.interaction_token,
@@ -365,15 +866,24 @@ class InteractionResponse:
             components,
             embeds,
             tts,
-            ephemeral
+            ephemeral,
+            files
         )
 
-        return InteractionMessage(content, embeds, components, ephemeral, self, files, self.interaction_id, self.interaction_token)
+        self._responded = True
+        return InteractionMessage(content, embeds, components, ephemeral, self, files, self.interaction_id, self.interaction_token, message.id)
 
 
     async def defer(self, ephemeral=False, edit_original=False):
+        await self._wait_auto_deferral()
+        if self._deferred or self._acknowledged_update:
+            return
+
         self._deferred = True
-        await InteractionsHandler(self._bot).defer(
+        self._deferred_update = edit_original
+        if self._bot.handler.handler.metrics is not None:
+            self._bot.handler.handler.metrics.increment('interactions_deferrals_total', {'auto': 'false'})
+        await self._bot.handler.handler.defer(
             self.interaction_id,
             self.interaction_token,
             ephemeral,
@@ -383,58 +893,100 @@ class InteractionResponse:
 
     async def edit_original(self, **kwargs):
         mention_author = kwargs.get('mention_author', True)
-        content = kwargs.get('content', getattr(self.message, 'content', None))
+        #self.message is only built for the fields that weren't passed, so lazy responses can edit without parsing it
+        content = kwargs.get('content', _MISSING)
+        if content is _MISSING:
+            content = getattr(self.message, 'content', None)
+
         embs = kwargs.get('embed', [])
         if embs == []:
-            embs = kwargs.get('embeds', self.message.embeds)
+            embs = kwargs.get('embeds', _MISSING)
+            if embs is _MISSING:
+                embs = self.message.embeds
 
         if embs is None:
             embs = []
 
-        components = kwargs.get('components', getattr(self.message, 'components', []))
+        components = kwargs.get('components', _MISSING)
+        if components is _MISSING:
+            components = getattr(self.message, 'components', [])
+
+        await self._wait_auto_deferral()
 
-        if self._deferred:
+        if self._deferred and not self._deferred_update:
             raise TypeError('edit_original should only be used if the interaction response has not been deferred.')
 
-        await InteractionsHandler(self._bot).edit_original(
-            self.interaction_id,
-            self.interaction_token,
-            content,
-            embs,
-            components,
-            mention_author
-        )
+        if self._deferred or self._acknowledged_update:
+            #deferred with type 6 so @original is the component message itself
+            await self._bot.handler.handler.edit_response(
+                self.channel_id,
+                self.interaction_token,
+                content,
+                components,
+                embs,
+                None,
+                self.message_id
+            )
 
-        self.message.content = content
-        self.message.embeds = embs if isinstance(embs, list) else [embs]
-        self.message.components = components
+        else:
+            await self._bot.handler.handler.edit_original(
+                self.interaction_id,
+                self.interaction_token,
+                content,
+                embs,
+                components,
+                mention_author,
+                self.message_id
+            )
+
+        self._bot.handler.handler.invalidate_message(self.message_id)
+        self._message_edit = (content, embs if isinstance(embs, list) else [embs], components)
+        if self._message is not _MISSING:
+            self._apply_message_edit()
 
         self._responded = True
 
 
-    async def _edit_response(self, content, embeds, components, response_message, files):
-        await InteractionsHandler(self._bot).edit_response(
-            self.channel_id,
-            self.interaction_token,
-            content,
-            components,
-            embeds,
-            files
-        )
+    def _apply_message_edit(self):
+        self._message.content, self._message.embeds, self._message.components = self._message_edit
+
+
+    async def _edit_response(self, content, embeds, components, response_message, files, coalesce=False):
+        handler = self._bot.handler.handler
+        followup_id = response_message.message_id
+
+        if coalesce and not files:
+            async def send(content, components, embeds):
+                return await handler.edit_response(self.channel_id, self.interaction_token, content, components, embeds, None, followup_id=followup_id)
+
+            await handler.coalescer.submit(followup_id or self.interaction_token, send, content=content, components=components, embeds=embeds)
+
+        else:
+            await handler.edit_response(
+                self.channel_id,
+                self.interaction_token,
+                content,
+                components,
+                embeds,
+                files,
+                followup_id=followup_id
+            )
+
         response_message.content = content or response_message.content
         response_message.embeds = embeds
         response_message.components = components or response_message.components
         response_message.files = files
 
 
-    async def _delete_response(self):
-        await InteractionsHandler(self._bot).delete_response(
-            self.interaction_token
+    async def _delete_response(self, followup_id=None):
+        await self._bot.handler.handler.delete_response(
+            self.interaction_token,
+            followup_id
         )
 
 
 class InteractionMessage:
-    def __init__(self, content, embeds, components, ephemeral, interaction, discord_files, interaction_id, interaction_token):
+    def __init__(self, content, embeds, components, ephemeral, interaction, discord_files, interaction_id, interaction_token, message_id=None):
         self.content = content
         self.embeds = embeds
         self.components = components
@@ -443,15 +995,16 @@ class InteractionMessage:
         self.discord_files = discord_files
         self._interaction_id = interaction_id
         self._interaction_token = interaction_token
+        self.message_id = message_id #only set for follow-ups, otherwise this is @original
 
     
     async def delete(self):
         if self.ephemeral:
             raise RuntimeError('Cannot delete an ephemeral message.')
 
-        await self.interaction._delete_response()
+        await self.interaction._delete_response(self.message_id)
 
-    async def edit(self, content=None, embeds=None, components=None, files=None):
+    async def edit(self, content=None, embeds=None, components=None, files=None, coalesce=False):
         if content is None:
             content = self.content
         if embeds is None:
@@ -464,7 +1017,8 @@ class InteractionMessage:
             embeds,
             components,
             self,
-            files
+            files,
+            coalesce
         )
 
 
@@ -474,25 +1028,6 @@ class ComponentsHandler:
         self.handler = InteractionsHandler(self.bot)
     
 
-    @staticmethod
-    def _get_am(bot, kwargs):
-        if bot._connection.allowed_mentions:
-            allowed_mentions = bot._connection.allowed_mentions.to_dict()
-        else:
-            allowed_mentions = {}
-        
-        if kwargs.get('allowed_mentions'):
-            if kwargs['allowed_mentions'] is not None:
-                if bot._connection.allowed_mentions is not None:
-                    allowed_mentions = bot._connection.allowed_mentions.merge(allowed_mentions).to_dict()
-                else:
-                    allowed_mentions = allowed_mentions.to_dict()
-            else:
-                allowed_mentions = []
-        
-        return allowed_mentions
-
-
     async def send(self, channel, content=None, components=None, embeds=[], reply_to=None, mention_author=False, tts=False, files=None, **kwargs):
         if embeds == []:
             if kwargs.get('embed'):
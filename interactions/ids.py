@@ -0,0 +1,103 @@
+import itertools
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+from secrets import token_hex
+from .exceptions import CustomIdTooLong
+
+
+MAX_CUSTOM_ID_LENGTH = 100
+
+
+class CounterIdGenerator:
+    """Generates custom_ids from a per-process prefix and a counter.
+    Much cheaper than `secure_id_generator`, but the ids are predictable.
+    Give each shard or process its own `prefix` if they can send the same messages."""
+
+    def __init__(self, prefix=None):
+        self.prefix = token_hex(4) if prefix is None else prefix
+        self._counter = itertools.count()
+
+
+    def __call__(self):
+        return f'{self.prefix}.{next(self._counter):x}'
+
+
+def secure_id_generator():
+    return token_hex(50)
+
+
+_generator = CounterIdGenerator()
+
+
+def set_custom_id_generator(generator):
+    """Sets the function called for every component created without a custom_id."""
+    global _generator
+    _generator = generator
+
+
+def generate_custom_id():
+    return _generator()
+
+
+def _write_varint(buf, value):
+    while value > 0x7f:
+        buf.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _read_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def encode_custom_id(prefix, *values):
+    """Packs ints and strs into a custom_id starting with `prefix`, e.g. `encode_custom_id('page:', 3, user_id)`.
+    Use `decode_custom_id` with the same prefix to get them back when the component is used."""
+
+    buf = bytearray()
+    for value in values:
+        if isinstance(value, int):
+            if not -2**63 <= value < 2**63:
+                raise ValueError(f'{value} does not fit in 64 bits.')
+            zigzag = (value << 1) ^ (value >> 63)
+            _write_varint(buf, zigzag << 1)
+        elif isinstance(value, str):
+            encoded = value.encode('utf-8')
+            _write_varint(buf, (len(encoded) << 1) | 1)
+            buf += encoded
+        else:
+            raise TypeError(f'Only ints and strs can be stored in a custom_id, not {value.__class__.__name__}.')
+
+    custom_id = prefix + urlsafe_b64encode(buf).rstrip(b'=').decode('ascii')
+    if len(custom_id) > MAX_CUSTOM_ID_LENGTH:
+        raise CustomIdTooLong(f'Encoded custom_id is {len(custom_id)} characters long, the limit is {MAX_CUSTOM_ID_LENGTH}.')
+
+    return custom_id
+
+
+def decode_custom_id(custom_id, prefix=''):
+    if not custom_id.startswith(prefix):
+        raise ValueError(f'custom_id does not start with {prefix!r}.')
+
+    encoded = custom_id[len(prefix):]
+    data = urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4))
+    values = []
+    pos = 0
+
+    while pos < len(data):
+        header, pos = _read_varint(data, pos)
+        if header & 1:
+            end = pos + (header >> 1)
+            values.append(data[pos:end].decode('utf-8'))
+            pos = end
+        else:
+            zigzag = header >> 1
+            values.append((zigzag >> 1) ^ -(zigzag & 1))
+
+    return tuple(values)
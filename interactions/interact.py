@@ -1,34 +1,108 @@
 import discord
-from .components import Utils
-from .handler import InteractionResponse, ComponentsHandler, ComponentMessage, PartialMessage, MessageReference
+import time
+from .handler import InteractionResponse, ComponentsHandler, PartialMessage, MessageReference
+from .router import ComponentRouter
+from .guilds import GuildResolver
+from .deadline import DeferralScheduler
+from .throttle import ClickThrottle
 
 
 class InitialiseComponentInteractionBase:
-    def __init__(self, bot):
+    def __init__(self, bot, lazy=False, auto_defer=False, parser_hook=False, metrics=None, workers=None, throttle=None, recorder=None):
         discord.message.MessageReference = MessageReference #otherwise messages with replies will raise a KeyError
         self.bot = bot
+        self.lazy = lazy
         self.bot.osr = self.on_socket_response
-        self.bot.add_listener(self.bot.osr, 'on_socket_response')
+
+        if parser_hook:
+            #only INTERACTION_CREATE reaches us, rather than a coroutine being scheduled for every gateway event
+            self.bot._connection.parsers['INTERACTION_CREATE'] = self._parse_interaction
+        else:
+            self.bot.add_listener(self.bot.osr, 'on_socket_response')
+
         self.bot.handler = ComponentsHandler(self.bot)
+        self.bot.router = ComponentRouter(self.bot)
+        self.bot.guild_resolver = GuildResolver(self.bot)
+
+        if auto_defer is True:
+            auto_defer = DeferralScheduler(self.bot)
+        elif auto_defer is False:
+            auto_defer = None
+        self.deferrals = self.bot.deferrals = auto_defer
+        self.metrics = self.bot.handler.handler.metrics = metrics
+        if throttle is True:
+            throttle = ClickThrottle()
+        elif throttle is False:
+            throttle = None
+        self.throttle = throttle
+        self.recorder = recorder
+        self.workers = workers
+        if workers is not None:
+            workers.start()
+        self.bot.add_listener(self.on_raw_message_edit, 'on_raw_message_edit')
+        self.bot.add_listener(self.on_raw_message_delete, 'on_raw_message_delete')
+
+
+    async def on_raw_message_edit(self, payload):
+        self.bot.handler.handler.invalidate_message(payload.message_id)
+        self.bot.handler.handler.message_edited(payload.message_id, payload.data.get('edited_timestamp'))
+
+
+    async def on_raw_message_delete(self, payload):
+        self.bot.handler.handler.invalidate_message(payload.message_id)
+        self.bot.handler.handler.forget_edit(payload.message_id)
+
+
+    def _parse_interaction(self, d):
+        #parsers run inside the gateway's receive loop, where an exception would disconnect the bot
+        try:
+            self.handle_interaction(d)
+        except Exception as e:
+            self.bot.loop.create_task(self._on_parser_error(e, d))
+
+
+    async def _on_parser_error(self, error, d):
+        try:
+            raise error
+        except Exception:
+            await self.bot.on_error('interaction_create', d)
 
 
     async def on_socket_response(self, payload):
         if payload['t'] != 'INTERACTION_CREATE':
             return
 
-        if not payload.get('d'):
+        self.handle_interaction(payload['d'])
+
+
+    def handle_interaction(self, d):
+        if not d:
+            return
+
+        if self.recorder is not None:
+            self.recorder.record(d)
+
+        if not d.get('message', {}).get('components') and not d.get('data', {}).get('custom_id'):
             return
 
-        elif not payload['d'].get('message', {}).get('components') and not payload['d'].get('data', {}).get('custom_id'):
+        if self.throttle is not None and not self._allow(d):
             return
-         
 
-        d = payload['d']
-        msg_dict = payload['d'].get('message')
+        if self.workers is not None:
+            self.workers.submit(d)
+            return
+
+        if self.lazy:
+            resp = InteractionResponse.from_payload(self.bot, d)
+            self._dispatch(resp)
+            return resp
+
+        received_at = time.monotonic()
+        msg_dict = d.get('message')
 
         member_id = int(d['member']['user']['id'])
         guild_id = int(d['guild_id'])
-        guild = self.bot.get_guild(guild_id) or await self.bot.fetch_guild(guild_id)
+        guild = self.bot.guild_resolver.resolve(guild_id, d)
         member = discord.Member(data=d['member'], guild=guild, state=self.bot._connection)
         interaction_id = int(d['id'])
         interaction_token = d['token']
@@ -45,7 +119,7 @@ class InitialiseComponentInteractionBase:
             )
 
         else:
-            message = ComponentMessage(state=self.bot._connection, channel=channel, data=msg_dict)
+            message = self.bot.handler.handler.component_message(msg_dict, channel)
 
         resp = InteractionResponse(
                 self.bot,
@@ -63,8 +137,36 @@ class InitialiseComponentInteractionBase:
                 component_type,
             )
 
-        if component_type == 2:
-            self.bot.dispatch('button_press', resp)
-        elif component_type == 3:
+        if component_type == 3:
             resp.values = d['data']['values']
-            self.bot.dispatch('selection', resp)
+
+        resp._received_at = received_at
+        self._dispatch(resp)
+        return resp
+
+
+    def _allow(self, d):
+        key = (d['member']['user']['id'], d['message']['id'], d['data']['custom_id'])
+        if self.throttle.allow(key):
+            return True
+
+        self.bot.handler.handler.acknowledge(d['id'], d['token'])
+        if self.metrics is not None:
+            self.metrics.increment('interactions_throttled_total', {'component_type': d['data']['component_type']})
+        return False
+
+
+    def _dispatch(self, resp):
+        if self.deferrals is not None:
+            self.deferrals.schedule(resp)
+
+        if not self.bot.router.dispatch(resp):
+            if resp.component_type == 2:
+                self.bot.dispatch('button_press', resp)
+            elif resp.component_type == 3:
+                self.bot.dispatch('selection', resp)
+
+        if self.metrics is not None:
+            labels = {'component_type': resp.component_type}
+            self.metrics.increment('interactions_total', labels)
+            self.metrics.observe('interactions_dispatch_seconds', labels, time.monotonic() - resp._received_at)
@@ -0,0 +1,153 @@
+import time
+
+
+def route_label(route):
+    """The route's path with ids and tokens taken out, so requests can be grouped by endpoint."""
+    parts = route.path.split('/')
+
+    if parts[1] == 'interactions':
+        parts[2:4] = ['{interaction_id}', '{token}']
+    elif parts[1] == 'webhooks':
+        parts[2:4] = ['{application_id}', '{token}']
+    else:
+        parts = [('{id}' if part.isdigit() else part) for part in parts]
+
+    return f'{route.method} {"/".join(parts)}'
+
+
+class Metrics:
+    """Hands timings, counters and gauges from the library to one or more sinks.
+
+    Pass it as `InitialiseComponentInteractionBase(bot, metrics=Metrics(PrometheusExporter()))`.
+    Nothing is recorded, and the hot paths skip all of this, while `metrics` is None."""
+
+    def __init__(self, *sinks):
+        self.sinks = list(sinks)
+
+
+    def increment(self, name, labels=None, value=1):
+        for sink in self.sinks:
+            sink.increment(name, labels, value)
+
+
+    def gauge(self, name, labels=None, delta=1):
+        for sink in self.sinks:
+            sink.gauge(name, labels, delta)
+
+
+    def observe(self, name, labels=None, value=0):
+        for sink in self.sinks:
+            sink.observe(name, labels, value)
+
+
+    async def time_request(self, send, route, kwargs):
+        labels = {'route': route_label(route)}
+        self.gauge('interactions_rest_in_flight', labels, 1)
+        start = time.monotonic()
+
+        try:
+            result = await send(route, **kwargs)
+        except Exception as e:
+            self.increment('interactions_rest_failures_total', dict(labels, error=e.__class__.__name__))
+            raise
+        finally:
+            self.gauge('interactions_rest_in_flight', labels, -1)
+            self.observe('interactions_rest_seconds', labels, time.monotonic() - start)
+
+        return result
+
+
+class CallbackSink:
+    """Calls `callback(kind, name, labels, value)` for everything recorded,
+    where `kind` is one of 'counter', 'gauge' or 'timing'."""
+
+    def __init__(self, callback):
+        self.callback = callback
+
+
+    def increment(self, name, labels, value):
+        self.callback('counter', name, labels, value)
+
+
+    def gauge(self, name, labels, delta):
+        self.callback('gauge', name, labels, delta)
+
+
+    def observe(self, name, labels, value):
+        self.callback('timing', name, labels, value)
+
+
+class PrometheusExporter:
+    """Aggregates metrics in memory and renders them in Prometheus' text format with `render()`."""
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {} #key -> [bucket counts..., sum, count]
+
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items())) if labels else ()
+
+
+    def increment(self, name, labels, value):
+        key = self._key(name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+
+    def gauge(self, name, labels, delta):
+        key = self._key(name, labels)
+        self.gauges[key] = self.gauges.get(key, 0) + delta
+
+
+    def observe(self, name, labels, value):
+        key = self._key(name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = [0] * (len(self.buckets) + 2)
+
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                histogram[i] += 1
+        histogram[-2] += value
+        histogram[-1] += 1
+
+
+    @staticmethod
+    def _labels(labels, extra=()):
+        labels = tuple(labels) + tuple(extra)
+        if not labels:
+            return ''
+        return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}'
+
+
+    def render(self):
+        lines = []
+        typed = set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f'# TYPE {name} {kind}')
+
+        for (name, labels), value in sorted(self.counters.items()):
+            header(name, 'counter')
+            lines.append(f'{name}{self._labels(labels)} {value}')
+
+        for (name, labels), value in sorted(self.gauges.items()):
+            header(name, 'gauge')
+            lines.append(f'{name}{self._labels(labels)} {value}')
+
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            header(name, 'histogram')
+            for bound, count in zip(self.buckets, histogram):
+                lines.append(f'{name}_bucket{self._labels(labels, (("le", bound),))} {count}')
+            lines.append(f'{name}_bucket{self._labels(labels, (("le", "+Inf"),))} {histogram[-1]}')
+            lines.append(f'{name}_sum{self._labels(labels)} {histogram[-2]}')
+            lines.append(f'{name}_count{self._labels(labels)} {histogram[-1]}')
+
+        return '\n'.join(lines) + '\n'
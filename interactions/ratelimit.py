@@ -0,0 +1,239 @@
+import heapq
+import itertools
+from enum import IntEnum
+from aiohttp import TraceConfig
+
+
+class Priority(IntEnum):
+    Callback = 0
+    Webhook = 1
+    Channel = 2
+
+
+class _Bucket:
+    __slots__ = ('remaining', 'reset_at', 'inflight')
+
+    def __init__(self):
+        self.remaining = None #requests that can still start before reset_at, None until a response has said
+        self.reset_at = 0
+        self.inflight = 0
+
+
+class RequestScheduler:
+    """Queues the library's REST requests per rate limit bucket before they reach `bot.http`.
+
+    Interaction callbacks (`/interactions/{id}/{token}/callback`) are never queued, and while any are in flight
+    `callback_reserve` of the `max_concurrency` slots are kept free for them. Everything else is grouped into buckets
+    (per interaction token for webhooks, per channel for channel messages, with deletes separate) and runs highest
+    priority first, with at most as many requests in flight per bucket as the `X-RateLimit-*` headers of previous
+    responses say are remaining, waiting for exhausted buckets to reset. Idle buckets are only kept until they reset,
+    so one per interaction token doesn't add up."""
+
+    def __init__(self, bot, max_concurrency=50, callback_reserve=10):
+        self.bot = bot
+        self.max_concurrency = max_concurrency
+        self.callback_reserve = min(callback_reserve, max_concurrency - 1)
+        self._buckets = {}
+        self._queue = [] #(priority, seq, bucket key, future)
+        self._counter = itertools.count()
+        self._inflight = 0
+        self._callbacks = 0
+        self._urls = {} #url -> bucket key, for requests currently in flight
+        self._timer = None
+        self._resets = [] #(reset_at, seq, bucket key) of idle buckets kept until they reset
+        self._sweep_handle = None
+        self._sweep_at = None
+        self._tracing = False
+
+
+    @staticmethod
+    def classify(route):
+        parts = route.path.split('/', 4)
+
+        if parts[1] == 'interactions':
+            return Priority.Callback, None
+        elif parts[1] == 'webhooks':
+            return Priority.Webhook, ('webhook', parts[3])
+
+        if route.method == 'DELETE':
+            return Priority.Channel, (parts[1], parts[2], 'DELETE') #message deletes have their own rate limit
+
+        return Priority.Channel, (parts[1], parts[2])
+
+
+    async def request(self, route, send=None, **kwargs):
+        if send is None:
+            send = self.bot.http.request
+
+        if not self._tracing:
+            self._install_trace()
+
+        priority, key = self.classify(route)
+
+        if priority is Priority.Callback:
+            self._callbacks += 1
+            try:
+                return await send(route, **kwargs)
+            finally:
+                self._callbacks -= 1
+                self._wake()
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket()
+
+        if self._queue or not self._available(bucket):
+            future = self.bot.loop.create_future()
+            heapq.heappush(self._queue, (priority, next(self._counter), key, future))
+            self._wake()
+            try:
+                await future
+            except BaseException:
+                if future.done() and not future.cancelled():
+                    self._release(key) #woken up but cancelled before starting
+                raise
+        else:
+            self._start(bucket)
+
+        self._urls[route.url] = key
+        try:
+            return await send(route, **kwargs)
+        finally:
+            self._urls.pop(route.url, None)
+            self._release(key)
+
+
+    def _limit(self):
+        return self.max_concurrency - self.callback_reserve if self._callbacks else self.max_concurrency
+
+
+    def _available(self, bucket):
+        if self._inflight >= self._limit():
+            return False
+
+        return bucket.remaining != 0 or bucket.reset_at <= self.bot.loop.time()
+
+
+    def _start(self, bucket):
+        bucket.inflight += 1
+        self._inflight += 1
+        if bucket.remaining and bucket.reset_at > self.bot.loop.time():
+            bucket.remaining -= 1
+
+
+    def _release(self, key):
+        self._inflight -= 1
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.inflight -= 1
+            if not bucket.inflight:
+                if bucket.remaining is None or bucket.reset_at <= self.bot.loop.time():
+                    del self._buckets[key]
+                else:
+                    self._keep_until_reset(key, bucket)
+
+        self._wake()
+
+
+    def _keep_until_reset(self, key, bucket):
+        heapq.heappush(self._resets, (bucket.reset_at, next(self._counter), key))
+        if self._sweep_at is None or bucket.reset_at < self._sweep_at:
+            self._arm_sweep()
+
+
+    def _arm_sweep(self):
+        if self._sweep_handle is not None:
+            self._sweep_handle.cancel()
+        self._sweep_at = self._resets[0][0]
+        self._sweep_handle = self.bot.loop.call_at(self._sweep_at, self._sweep)
+
+
+    def _sweep(self):
+        self._sweep_handle = self._sweep_at = None
+        now = self.bot.loop.time()
+
+        while self._resets and self._resets[0][0] <= now:
+            _, _, key = heapq.heappop(self._resets)
+            bucket = self._buckets.get(key)
+            if bucket is not None and not bucket.inflight and bucket.reset_at <= now:
+                del self._buckets[key]
+
+        if self._resets:
+            self._arm_sweep()
+
+
+    def _wake(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        skipped = []
+        next_reset = None
+
+        while self._queue and self._inflight < self._limit():
+            entry = heapq.heappop(self._queue)
+            _, _, key, future = entry
+            if future.done():
+                continue
+
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket()
+
+            if not self._available(bucket):
+                #the global limit was checked above, so this bucket is exhausted until it resets
+                skipped.append(entry)
+                next_reset = min(next_reset or bucket.reset_at, bucket.reset_at)
+                continue
+
+            self._start(bucket)
+            future.set_result(None)
+
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
+
+        if next_reset is not None:
+            self._timer = self.bot.loop.call_at(next_reset, self._wake)
+
+
+    def update(self, key, headers):
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset_after = headers.get('X-RateLimit-Reset-After')
+        if remaining is None or reset_after is None:
+            return
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket()
+
+        #the other requests in flight may not have been counted in the header yet
+        bucket.remaining = max(0, int(remaining) - max(0, bucket.inflight - 1))
+        bucket.reset_at = self.bot.loop.time() + float(reset_after)
+        if not bucket.inflight:
+            self._keep_until_reset(key, bucket)
+
+
+    def observe(self, route, headers):
+        """Applies the rate limit headers of a response to `route` that didn't go through discord.py's session."""
+        key = self.classify(route)[1]
+        if key is not None:
+            self.update(key, headers)
+
+
+    def _install_trace(self):
+        #discord.py doesn't hand back response headers, so they're read off its session instead
+        self._tracing = True
+        session = getattr(self.bot.http, '_HTTPClient__session', None)
+        if session is None or not hasattr(session, '_trace_configs'):
+            self._tracing = False
+            return
+
+        async def on_request_end(session, ctx, params):
+            key = self._urls.get(str(params.url))
+            if key is not None:
+                self.update(key, params.response.headers)
+
+        trace = TraceConfig()
+        trace.on_request_end.append(on_request_end)
+        trace.freeze()
+        session._trace_configs.append(trace)
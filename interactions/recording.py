@@ -0,0 +1,100 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from .serialization import dumps_bytes
+
+
+def _open(path, mode, compress=None):
+    if compress is None:
+        compress = str(path).endswith('.gz')
+    return gzip.open(path, mode, compresslevel=6) if compress else open(path, mode)
+
+
+class InteractionRecorder:
+    """Writes the raw INTERACTION_CREATE payloads the bot receives to a JSON lines file for `read_recording`,
+    one `[seconds since the recording started, payload]` per line. Paths ending in `.gz` are gzipped.
+
+    With `anonymize=True` user ids are replaced by stable pseudonymous ids (so per-user behaviour still replays the same),
+    usernames, message content and embeds are blanked, replied-to messages are dropped and interaction tokens are
+    replaced. Pass it as `recorder=` to `InitialiseComponentInteractionBase` and `close()` it on shutdown."""
+
+    def __init__(self, path, anonymize=False, compress=None):
+        self.path = path
+        self.anonymize = anonymize
+        self.recorded = 0
+        self._file = _open(path, 'wb', compress)
+        self._start = time.monotonic()
+        self._salt = os.urandom(16)
+
+
+    def record(self, d):
+        if self._file is None:
+            return
+
+        if self.anonymize:
+            d = self._anonymize(d)
+
+        self._file.write(dumps_bytes([round(time.monotonic() - self._start, 6), d]) + b'\n')
+        self.recorded += 1
+
+
+    def _user_id(self, user_id):
+        digest = hashlib.blake2b(user_id.encode('utf-8'), digest_size=7, key=self._salt).digest()
+        return str(int.from_bytes(digest, 'big'))
+
+
+    def _token(self, token):
+        return hashlib.blake2b(token.encode('utf-8'), digest_size=32, key=self._salt).hexdigest()
+
+
+    def _user(self, user):
+        return dict(user, id=self._user_id(user['id']), username='user', discriminator='0000', avatar=None)
+
+
+    def _anonymize(self, d):
+        d = dict(d, token=self._token(d['token']))
+
+        member = d.get('member')
+        if member is not None:
+            d['member'] = dict(member, user=self._user(member['user']), nick=None)
+        if d.get('user') is not None:
+            d['user'] = self._user(d['user'])
+
+        message = d.get('message')
+        if message is not None and len(message) > 2:
+            message = dict(message, content='x' * len(message.get('content') or ''))
+            if message.get('author') is not None and not message['author'].get('bot'):
+                message['author'] = self._user(message['author'])
+            message['mentions'] = [self._user(user) for user in message.get('mentions', ())]
+            interaction = message.get('interaction')
+            if interaction is not None and interaction.get('user') is not None:
+                #whoever used the interaction that sent the message, on everything sent through respond()
+                message['interaction'] = dict(interaction, user=self._user(interaction['user']))
+                message['interaction'].pop('member', None)
+            message['embeds'] = []
+            message.pop('referenced_message', None)
+            d['message'] = message
+
+        return d
+
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_recording(path, compress=None):
+    """Yields `(offset, payload)` for every interaction in a file written by `InteractionRecorder`."""
+    with _open(path, 'rb', compress) as f:
+        for line in f:
+            if line.strip():
+                offset, d = json.loads(line)
+                yield offset, d
@@ -0,0 +1,123 @@
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PersistentRegistry:
+    """Component handlers registered by custom_id prefix, with per-message state kept in SQLite.
+
+    Handlers are called with `(interaction, state)` where `state` is whatever was last stored for the message
+    with `set_state` (or None). Nothing is held in memory per open message, and since handlers are looked up by prefix
+    and state lives on disk, components keep working after a restart as soon as the handlers are registered again.
+    Queries run on a dedicated thread so a slow disk doesn't block the event loop, which is why `get_state`, `set_state`,
+    `delete_state` and `purge` are coroutines. `InitialiseComponentInteractionBase` must have been set up first."""
+
+    def __init__(self, bot, path='components.db', default_ttl=None, purge_interval=3600):
+        self.bot = bot
+        self.default_ttl = default_ttl
+        self.purge_interval = purge_interval
+        #one thread keeps queries on the shared connection in order
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='PersistentRegistry')
+        self.db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute('CREATE TABLE IF NOT EXISTS component_state (message_id INTEGER PRIMARY KEY, state TEXT NOT NULL, expires_at REAL)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS component_state_expiry ON component_state (expires_at)')
+        self._entries = {}
+        self._purge_handle = None
+
+        if purge_interval:
+            self._schedule_purge()
+
+
+    def register(self, prefix, callback):
+        async def run(resp):
+            await callback(resp, await self.get_state(resp.message_id))
+
+        self.unregister(prefix)
+        self._entries[prefix] = self.bot.router.add_callback(run, prefix=prefix)
+
+
+    def unregister(self, prefix):
+        entry = self._entries.pop(prefix, None)
+        if entry is not None:
+            self.bot.router.remove(entry)
+
+
+    def handler(self, prefix):
+        def decorator(func):
+            self.register(prefix, func)
+            return func
+
+        return decorator
+
+
+    def _run(self, func, *args):
+        return self.bot.loop.run_in_executor(self._executor, func, *args)
+
+
+    async def set_state(self, message_id, state, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        await self._run(
+            self.db.execute,
+            'INSERT OR REPLACE INTO component_state (message_id, state, expires_at) VALUES (?, ?, ?)',
+            (message_id, json.dumps(state, separators=(',', ':')), time.time() + ttl if ttl is not None else None)
+        )
+
+
+    async def get_state(self, message_id):
+        state = await self._run(self._get_state, message_id)
+        return json.loads(state) if state is not None else None
+
+
+    def _get_state(self, message_id):
+        row = self.db.execute('SELECT state, expires_at FROM component_state WHERE message_id = ?', (message_id,)).fetchone()
+        if row is None:
+            return None
+
+        state, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self._delete_state(message_id)
+            return None
+
+        return state
+
+
+    async def delete_state(self, message_id):
+        await self._run(self._delete_state, message_id)
+
+
+    def _delete_state(self, message_id):
+        self.db.execute('DELETE FROM component_state WHERE message_id = ?', (message_id,))
+
+
+    async def purge(self):
+        """Deletes expired state, returning how many rows were removed."""
+        return await self._run(self._purge_expired)
+
+
+    def _purge_expired(self):
+        return self.db.execute('DELETE FROM component_state WHERE expires_at <= ?', (time.time(),)).rowcount
+
+
+    def _schedule_purge(self):
+        self._purge_handle = self.bot.loop.call_later(self.purge_interval, self._purge)
+
+
+    def _purge(self):
+        self.bot.loop.create_task(self.purge())
+        self._schedule_purge()
+
+
+    def close(self):
+        if self._purge_handle is not None:
+            self._purge_handle.cancel()
+            self._purge_handle = None
+
+        for prefix in list(self._entries):
+            self.unregister(prefix)
+
+        #queued queries finish before the connection is closed
+        self._executor.submit(self.db.close)
+        self._executor.shutdown(wait=False)
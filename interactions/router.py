@@ -0,0 +1,188 @@
+import asyncio
+import re
+
+
+class RouteEntry:
+    __slots__ = ('custom_id', 'message_id', 'prefix', 'pattern', 'callback', 'future', 'check', 'once', '_handle')
+
+    def __init__(self, custom_id, message_id, prefix, pattern, callback, future, check, once):
+        self.custom_id = custom_id
+        self.message_id = message_id
+        self.prefix = prefix
+        self.pattern = pattern
+        self.callback = callback
+        self.future = future
+        self.check = check
+        self.once = once
+        self._handle = None
+
+
+    def __repr__(self):
+        return f'<RouteEntry custom_id={self.custom_id}, message_id={self.message_id}, prefix={self.prefix}, pattern={self.pattern}>'
+
+
+    def matches(self, resp):
+        if self.message_id is not None and self.message_id != resp.message_id:
+            return False
+
+        if self.pattern is not None and not self.pattern.match(resp.custom_id):
+            return False
+
+        return self.check is None or self.check(resp)
+
+
+class ComponentRouter:
+    """Resolves component interactions to their waiters and callbacks
+    by `custom_id` and message id instead of running every `wait_for` check."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._exact = {} #(message_id, custom_id) -> [RouteEntry]
+        self._prefixes = {} #prefix length -> {prefix: [RouteEntry]}
+        self._patterns = []
+
+
+    def __len__(self):
+        return sum(len(e) for e in self._exact.values()) \
+            + sum(len(e) for p in self._prefixes.values() for e in p.values()) \
+            + len(self._patterns)
+
+
+    def _add(self, custom_id, message_id, prefix, pattern, callback, future, check, once, timeout):
+        if custom_id is None and message_id is None and prefix is None and pattern is None:
+            raise TypeError('At least one of custom_id, message_id, prefix or pattern is required.')
+
+        if isinstance(pattern, str):
+            pattern = re.compile(pattern)
+
+        entry = RouteEntry(custom_id, message_id, prefix, pattern, callback, future, check, once)
+
+        if pattern is not None:
+            self._patterns.append(entry)
+        elif prefix is not None:
+            self._prefixes.setdefault(len(prefix), {}).setdefault(prefix, []).append(entry)
+        else:
+            self._exact.setdefault((message_id, custom_id), []).append(entry)
+
+        if timeout is not None:
+            entry._handle = self.bot.loop.call_later(timeout, self._expire, entry)
+
+        return entry
+
+
+    def remove(self, entry):
+        if entry._handle is not None:
+            entry._handle.cancel()
+            entry._handle = None
+
+        if entry.pattern is not None:
+            if entry in self._patterns:
+                self._patterns.remove(entry)
+            return
+
+        if entry.prefix is not None:
+            container = self._prefixes.get(len(entry.prefix), {})
+            key = entry.prefix
+        else:
+            container = self._exact
+            key = (entry.message_id, entry.custom_id)
+
+        bucket = container.get(key)
+        if not bucket or entry not in bucket:
+            return
+
+        bucket.remove(entry)
+        if not bucket:
+            del container[key]
+            if entry.prefix is not None and not container:
+                del self._prefixes[len(entry.prefix)]
+
+
+    def _expire(self, entry):
+        entry._handle = None
+        self.remove(entry)
+        if entry.future is not None and not entry.future.done():
+            entry.future.set_exception(asyncio.TimeoutError())
+
+
+    def add_callback(self, callback, custom_id=None, *, message_id=None, prefix=None, pattern=None, check=None, once=False, timeout=None):
+        """Registers a coroutine function called with the `InteractionResponse`
+        of every matching interaction. Returns the `RouteEntry`, which can be passed to `remove`."""
+
+        return self._add(custom_id, message_id, prefix, pattern, callback, None, check, once, timeout)
+
+
+    def callback(self, custom_id=None, **kwargs):
+        def decorator(func):
+            self.add_callback(func, custom_id, **kwargs)
+            return func
+
+        return decorator
+
+
+    async def wait_for(self, custom_id=None, *, message_id=None, prefix=None, pattern=None, check=None, timeout=None):
+        """A drop-in for `bot.wait_for('button_press')`/`bot.wait_for('selection')`
+        that only gets woken up by interactions routed to it.
+        Raises `asyncio.TimeoutError` once `timeout` passes."""
+
+        future = self.bot.loop.create_future()
+        entry = self._add(custom_id, message_id, prefix, pattern, None, future, check, True, timeout)
+
+        try:
+            return await future
+        finally:
+            self.remove(entry)
+
+
+    def _candidates(self, message_id, custom_id):
+        exact = self._exact
+        if exact:
+            for key in ((message_id, custom_id), (message_id, None), (None, custom_id)):
+                entries = exact.get(key)
+                if entries:
+                    yield from tuple(entries)
+
+        for length, prefixes in tuple(self._prefixes.items()):
+            entries = prefixes.get(custom_id[:length])
+            if entries:
+                yield from tuple(entries)
+
+        if self._patterns:
+            yield from tuple(self._patterns)
+
+
+    def dispatch(self, resp):
+        """Hands `resp` to every matching waiter and callback.
+        Returns whether anything was matched."""
+
+        matched = False
+
+        for entry in self._candidates(resp.message_id, resp.custom_id):
+            if not entry.matches(resp):
+                continue
+
+            if entry.future is not None:
+                if entry.future.done():
+                    continue
+                entry.future.set_result(resp)
+            else:
+                self.bot.loop.create_task(self._run_callback(entry.callback, resp))
+
+            if entry.once:
+                self.remove(entry)
+
+            matched = True
+
+        return matched
+
+
+    async def _run_callback(self, callback, resp):
+        try:
+            await callback(resp)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            try:
+                await self.bot.on_error('component_callback', resp)
+            except asyncio.CancelledError:
+                pass
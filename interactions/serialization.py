@@ -0,0 +1,54 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+def _orjson_dumps(obj, default=None):
+    return orjson.dumps(obj, default=default)
+
+
+def _ujson_dumps(obj, default=None):
+    return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False, default=default).encode('utf-8')
+
+
+def _stdlib_dumps(obj, default=None):
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=default).encode('utf-8')
+
+
+JSON_BACKENDS = {}
+if orjson is not None:
+    JSON_BACKENDS['orjson'] = _orjson_dumps
+if ujson is not None:
+    JSON_BACKENDS['ujson'] = _ujson_dumps
+JSON_BACKENDS['json'] = _stdlib_dumps
+
+_backend = next(iter(JSON_BACKENDS))
+_dumps = JSON_BACKENDS[_backend]
+
+
+def set_json_backend(name):
+    """Picks the encoder used for request bodies and `FrozenLayout`s, one of `JSON_BACKENDS`.
+    The fastest installed one (orjson, then ujson, then the standard library) is used by default."""
+
+    global _backend, _dumps
+    if name not in JSON_BACKENDS:
+        raise ValueError(f'JSON backend {name!r} is not available, expected one of {", ".join(JSON_BACKENDS)}.')
+    _backend = name
+    _dumps = JSON_BACKENDS[name]
+
+
+def json_backend():
+    return _backend
+
+
+def dumps_bytes(obj, default=None):
+    """Compact UTF-8 encoded JSON."""
+    return _dumps(obj, default)
@@ -0,0 +1,102 @@
+import asyncio
+import json
+from aiohttp import web
+
+try:
+    from nacl.signing import VerifyKey
+    from nacl.exceptions import BadSignatureError
+except ImportError:
+    VerifyKey = None
+
+
+class InteractionServer:
+    """Receives interactions on an outgoing webhook URL instead of the gateway.
+
+    Requests are verified against the application's Ed25519 public key (this needs PyNaCl) and handed to the same
+    `handle_interaction` as gateway interactions, so `button_press`/`selection`, the router and `InteractionResponse` all
+    work as usual. The initial callback (`respond`, `defer` or `edit_original`) is sent back as the HTTP response
+    rather than POSTed to `/interactions/{id}/{token}/callback`. If nothing has responded after `timeout` seconds the
+    interaction is acknowledged with a deferred update, like `DeferralScheduler` would, and a late `respond` is sent
+    as a follow-up instead.
+
+    ```py
+    base = interactions.InitialiseComponentInteractionBase(bot)
+    server = interactions.InteractionServer(base, PUBLIC_KEY)
+    await server.start('0.0.0.0', 8080)
+    ```"""
+
+    def __init__(self, base, public_key, path='/interactions', timeout=2.5):
+        if VerifyKey is None:
+            raise RuntimeError('PyNaCl is required for InteractionServer, install it with `pip install pynacl`.')
+
+        if base.workers is not None:
+            raise TypeError('InteractionServer cannot be used together with a WorkerPool.')
+
+        self.base = base
+        self.bot = base.bot
+        self.path = path
+        self.timeout = timeout
+        self.verify_key = VerifyKey(bytes.fromhex(public_key))
+        self.app = web.Application()
+        self.app.router.add_post(path, self.handle)
+        self._runner = None
+
+
+    def verify(self, signature, timestamp, body):
+        try:
+            self.verify_key.verify(timestamp.encode('utf-8') + body, bytes.fromhex(signature))
+        except (BadSignatureError, ValueError):
+            return False
+        return True
+
+
+    async def handle(self, request):
+        signature = request.headers.get('X-Signature-Ed25519')
+        timestamp = request.headers.get('X-Signature-Timestamp')
+        body = await request.read()
+
+        if signature is None or timestamp is None or not self.verify(signature, timestamp, body):
+            return web.Response(status=401, text='invalid request signature')
+
+        data = json.loads(body)
+        if data['type'] == 1:
+            return web.json_response({'type': 1})
+
+        handler = self.bot.handler.handler
+        token = data['token']
+        future = handler.capture_callback(token)
+
+        try:
+            resp = self.base.handle_interaction(data)
+            if resp is None:
+                if future.done() and not future.cancelled():
+                    #throttled clicks are acknowledged without a response being built
+                    return web.Response(body=future.result(), content_type='application/json')
+                return web.Response(status=400, text='unsupported interaction')
+
+            try:
+                response_body = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+            except asyncio.TimeoutError:
+                if future.done() and not future.cancelled():
+                    response_body = future.result()
+                else:
+                    #nothing has called back yet, so respond will send a follow-up and edit_original will edit @original
+                    resp._acknowledged_update = True
+                    response_body = b'{"type":6}'
+        finally:
+            #also covers handle_interaction raising, which would otherwise leave the future behind
+            handler.release_callback(token)
+
+        return web.Response(body=response_body, content_type='application/json')
+
+
+    async def start(self, host='0.0.0.0', port=8080, **kwargs):
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port, **kwargs).start()
+
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,360 @@
+import asyncio
+import math
+from .components import FrozenLayout
+
+
+class _WheelTimer:
+    __slots__ = ('expires', 'callback', 'args', 'cancelled', '_wheel')
+
+    def __init__(self, expires, callback, args, wheel):
+        self.expires = expires
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+        self._wheel = wheel
+
+
+    def cancel(self):
+        if not self.cancelled:
+            self.cancelled = True
+            self._wheel._count -= 1
+
+
+class TimerWheel:
+    """A hierarchical timer wheel for large numbers of coarse timeouts.
+
+    Scheduling and cancelling are O(1) and a single `call_later` drives every timer, instead of one event loop handle each.
+    Timers never fire early: they fire on the first tick at or after they're due, so at most `resolution` seconds late. `wheel_size ** levels`
+    ticks is the longest delay that doesn't need re-placing when it comes round."""
+
+    def __init__(self, loop, resolution=1.0, wheel_size=64, levels=4):
+        self.loop = loop
+        self.resolution = resolution
+        self.wheel_size = wheel_size
+        self._wheels = [[[] for _ in range(wheel_size)] for _ in range(levels)]
+        self._tick = 0
+        self._origin = loop.time()
+        self._count = 0
+        self._handle = None
+
+
+    def __len__(self):
+        return self._count
+
+
+    def _now(self):
+        return int((self.loop.time() - self._origin) / self.resolution)
+
+
+    def schedule(self, delay, callback, *args):
+        """Calls `callback(*args)` after `delay` seconds. Returns a timer with a `cancel()` method."""
+        if self._handle is None:
+            self._tick = self._now() #nothing is scheduled, so the wheel can skip ahead rather than catch up
+
+        #counted from the current time rather than self._tick, which can be up to a tick behind it
+        expires = math.ceil((self.loop.time() - self._origin + delay) / self.resolution)
+        timer = _WheelTimer(max(self._tick + 1, expires), callback, args, self)
+        self._place(timer)
+        self._count += 1
+
+        if self._handle is None:
+            self._arm()
+
+        return timer
+
+
+    def _place(self, timer):
+        delta = timer.expires - self._tick
+        size = self.wheel_size
+        last = len(self._wheels) - 1
+
+        for level, wheel in enumerate(self._wheels):
+            span = size ** level
+            if delta < span * size or level == last:
+                wheel[(timer.expires // span) % size].append(timer)
+                return
+
+
+    def _arm(self):
+        delay = (self._tick + 1) * self.resolution + self._origin - self.loop.time()
+        self._handle = self.loop.call_later(max(0, delay), self._advance)
+
+
+    def _advance(self):
+        self._handle = None
+        now = self._now()
+        size = self.wheel_size
+
+        while self._tick < now and self._count:
+            self._tick += 1
+            tick = self._tick
+
+            #move timers down from the higher levels whose slot has come round
+            span = size
+            for wheel in self._wheels[1:]:
+                if tick % span:
+                    break
+                slot = wheel[(tick // span) % size]
+                if slot:
+                    wheel[(tick // span) % size] = []
+                    for timer in slot:
+                        if not timer.cancelled:
+                            self._place(timer)
+                span *= size
+
+            slot = self._wheels[0][tick % size]
+            if not slot:
+                continue
+
+            self._wheels[0][tick % size] = []
+            for timer in slot:
+                if timer.cancelled:
+                    continue
+                if timer.expires > tick:
+                    self._place(timer) #only for delays longer than the wheel covers
+                    continue
+
+                timer.cancelled = True
+                self._count -= 1
+                try:
+                    timer.callback(*timer.args)
+                except Exception as e:
+                    self.loop.call_exception_handler({'message': 'Exception in TimerWheel callback', 'exception': e})
+
+        if self._count:
+            if self._tick < now:
+                self._tick = now
+            self._arm()
+
+
+def transition(custom_id, states=None, to=None):
+    """Declares a `ComponentSession` method as the handler for clicks on `custom_id`.
+
+    `states` limits it to sessions in one of those states (any state by default). The session moves to `to`
+    afterwards, or to whatever the handler returns if that isn't `None`."""
+
+    if isinstance(states, str):
+        states = (states,)
+
+    def decorator(func):
+        func.__session_transition__ = (custom_id, tuple(states) if states is not None else None, to)
+        return func
+
+    return decorator
+
+
+class ComponentSession:
+    """A message's components as a small state machine, instead of a `wait_for` loop.
+
+    Subclasses declare their transitions with `@interactions.transition(custom_id, ...)` and are started with
+    `await MySession.start(bot, channel, content=..., components=...)`. Sessions hold no coroutine while idle:
+    clicks are routed to them by message id and inactivity timeouts live in a `TimerWheel` shared by every session.
+    When a session times out its components are disabled, with one edit that only sends the components.
+
+    ```py
+    class Pager(interactions.ComponentSession):
+        timeout = 120
+
+        @interactions.transition('next')
+        async def next_page(self, resp):
+            self.data += 1
+            await self.edit(resp, content=f'Page {self.data}')
+
+    await Pager.start(bot, channel, content='Page 1', components=[...], data=1)
+    ```"""
+
+    __slots__ = ('bot', 'channel_id', 'message_id', 'layout', 'state', 'data', 'owner_id', 'closed', '_timer', '_route')
+
+    timeout = 180
+    initial_state = None
+    _transitions = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        transitions = dict(cls._transitions)
+        for name, func in vars(cls).items():
+            spec = getattr(func, '__session_transition__', None)
+            if spec is None:
+                continue
+            custom_id, states, to = spec
+            for state in states or (None,):
+                transitions[(state, custom_id)] = (name, to)
+        cls._transitions = transitions
+
+
+    def __init__(self, bot, channel_id, message_id, layout, data=None, owner_id=None):
+        self.bot = bot
+        self.channel_id = channel_id
+        self.message_id = message_id
+        self.layout = layout
+        self.state = self.initial_state
+        self.data = data
+        self.owner_id = owner_id
+        self.closed = False
+        self._timer = None
+        self._route = None
+
+
+    def __repr__(self):
+        return f'<{type(self).__name__} message_id={self.message_id} state={self.state!r}>'
+
+
+    @classmethod
+    async def start(cls, bot, channel, content=None, components=None, *, data=None, owner_id=None, **kwargs):
+        """Sends a message through `bot.handler.send` and starts a session on it."""
+        layout = components if isinstance(components, FrozenLayout) else FrozenLayout(components or [])
+        message = await bot.handler.send(channel, content, layout, **kwargs)
+        return cls.bind(bot, message.channel.id if message.channel else channel.id, message.id, layout, data=data, owner_id=owner_id)
+
+
+    @classmethod
+    def bind(cls, bot, channel_id, message_id, components, *, data=None, owner_id=None):
+        """Starts a session on a message that has already been sent with `components`."""
+        layout = components if isinstance(components, FrozenLayout) else FrozenLayout(components or [])
+        self = cls(bot, channel_id, message_id, layout, data, owner_id)
+        self._route = bot.router.add_callback(self._handle, message_id=message_id)
+        self._touch()
+        return self
+
+
+    def _touch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        if self.timeout is not None:
+            self._timer = _wheel(self.bot).schedule(self.timeout, _expire, self)
+
+
+    async def _handle(self, resp):
+        if self.closed:
+            return
+
+        if self.owner_id is not None and resp.member_id != self.owner_id:
+            await self.on_check_failed(resp)
+            return
+
+        transitions = self._transitions
+        entry = transitions.get((self.state, resp.custom_id)) or transitions.get((None, resp.custom_id))
+        if entry is None:
+            await self.on_unhandled(resp)
+            return
+
+        name, to = entry
+        self._touch()
+        state = await getattr(self, name)(resp)
+        if state is not None:
+            self.state = state
+        elif to is not None:
+            self.state = to
+
+
+    async def on_check_failed(self, resp):
+        """Called for clicks by anyone but `owner_id`. Acknowledges them without changing anything by default."""
+        await resp.defer(edit_original=True)
+
+
+    async def on_unhandled(self, resp):
+        """Called for clicks that no transition matches in the current state."""
+        await resp.defer(edit_original=True)
+
+
+    async def on_timeout(self):
+        """Called after the session has timed out and its components have been disabled."""
+
+
+    async def edit(self, resp=None, **kwargs):
+        """Edits the session's message, through `resp.edit_original` when answering a click
+        so no extra request is needed. Passing `components` replaces the layout that is disabled on timeout."""
+
+        components = kwargs.get('components')
+        if components is not None:
+            if not isinstance(components, FrozenLayout):
+                components = FrozenLayout(components)
+            self.layout = kwargs['components'] = components
+
+        if resp is not None:
+            await resp.edit_original(**kwargs)
+            return
+
+        if 'embed' in kwargs:
+            kwargs['embeds'] = [kwargs.pop('embed')]
+        content = kwargs.get('content')
+
+        #built like any other edit, but only what was passed is sent so the rest of the message is left alone
+        handler = self.bot.handler.handler
+        fields = handler.build_msg(str(content) if content is not None else None, kwargs.get('components'), kwargs.get('embeds'))
+        await handler._patch_message(self.channel_id, self.message_id)(
+            **{k: v for k, v in fields.items() if k in kwargs or k == 'allowed_mentions'}
+        )
+
+
+    def stop(self):
+        """Ends the session without touching the message."""
+        if self.closed:
+            return
+
+        self.closed = True
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._route is not None:
+            self.bot.router.remove(self._route)
+            self._route = None
+
+
+class _Expiry:
+    """Disables the components of every session that timed out in the same tick with one batch of edits."""
+
+    __slots__ = ('bot', 'pending', 'task', 'concurrency')
+
+    def __init__(self, bot, concurrency=5):
+        self.bot = bot
+        self.pending = []
+        self.task = None
+        self.concurrency = concurrency
+
+
+    def add(self, session):
+        self.pending.append(session)
+        if self.task is None:
+            self.task = self.bot.loop.create_task(self._flush())
+
+
+    async def _flush(self):
+        await asyncio.sleep(0)
+        sessions, self.pending = self.pending, []
+        self.task = None
+        handler = self.bot.handler.handler
+
+        def disable(session):
+            async def job():
+                send = handler._patch_message(session.channel_id, session.message_id)
+                await send(components=session.layout.with_overrides(disabled=True))
+            return job
+
+        result = await handler._run_bulk([([session], disable(session)) for session in sessions], self.concurrency)
+
+        for session, error in result.failed.items():
+            try:
+                raise error
+            except Exception:
+                await self.bot.on_error('session_timeout', session)
+
+        for session in sessions:
+            if type(session).on_timeout is not ComponentSession.on_timeout:
+                self.bot.loop.create_task(session.on_timeout())
+
+
+def _wheel(bot):
+    wheel = getattr(bot, 'timer_wheel', None)
+    if wheel is None:
+        wheel = bot.timer_wheel = TimerWheel(bot.loop)
+        bot.session_expiry = _Expiry(bot)
+    return wheel
+
+
+def _expire(session):
+    session._timer = None
+    if session.closed:
+        return
+    session.stop()
+    session.bot.session_expiry.add(session)
@@ -0,0 +1,51 @@
+import time
+from .cache import LRUCache
+
+
+class ClickThrottle:
+    """A token bucket per `(member_id, message_id, custom_id)`.
+
+    Each key can click `burst` times in a row and then `rate` times a second. Buckets are kept in an LRU of at most
+    `maxsize` keys and dropped as soon as they'd have refilled, so memory stays bounded during click storms.
+    Pass one as `throttle=` to `InitialiseComponentInteractionBase`; throttled clicks are acknowledged with a deferred
+    update and never reach handlers."""
+
+    def __init__(self, rate=1.0, burst=3, maxsize=10000):
+        if rate <= 0:
+            raise ValueError('rate must be greater than 0, use a small rate to only allow occasional clicks.')
+
+        self.rate = rate
+        self.burst = burst
+        self.buckets = LRUCache(maxsize)
+        self.throttled = 0
+
+
+    def __len__(self):
+        return len(self.buckets)
+
+
+    def allow(self, key):
+        now = time.monotonic()
+        bucket = self.buckets.get(key)
+
+        if bucket is None:
+            bucket = [self.burst, now]
+
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        allowed = tokens >= 1
+        bucket[0] = tokens - 1 if allowed else tokens
+        bucket[1] = now
+
+        #expires once it would have refilled, which is the same as starting a new bucket
+        self.buckets.set(key, bucket, (self.burst - bucket[0]) / self.rate)
+
+        if not allowed:
+            self.throttled += 1
+        return allowed
+
+
+    def reset(self, key=None):
+        if key is None:
+            self.buckets.clear()
+        else:
+            self.buckets.pop(key)
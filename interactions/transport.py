@@ -0,0 +1,134 @@
+import asyncio
+import discord
+import json
+from urllib.parse import quote
+from aiohttp import ClientSession, TCPConnector, FormData
+from .serialization import dumps_bytes
+
+
+_HANDLED_PREFIXES = ('/interactions/', '/webhooks/')
+
+
+async def _json_or_text(response):
+    text = await response.text(encoding='utf-8')
+    if response.content_type == 'application/json':
+        return json.loads(text)
+    return text
+
+
+class InteractionTransport:
+    """A dedicated HTTP client for interaction callbacks and webhook follow-ups.
+
+    These endpoints are authenticated by the interaction token rather than the bot token, so they don't need to go
+    through `bot.http` and its global rate limit lock. The transport keeps its own connection pool with keep-alive
+    connections and cached DNS lookups, so latency critical callbacks never wait behind bulk REST traffic.
+    aiohttp doesn't pipeline requests over a connection, so `limit_per_host` bounds how many requests can be in flight to
+    Discord at once. `base_url` can point at a local server for testing.
+
+    Enable it with `bot.handler.handler.use_transport(InteractionTransport())`."""
+
+    def __init__(self, base_url=discord.http.Route.BASE, *, limit=100, limit_per_host=0, keepalive_timeout=60.0,
+                 ttl_dns_cache=300, max_retries=5, user_agent=None, proxy=None):
+        self.base_url = base_url.rstrip('/')
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.max_retries = max_retries
+        self.user_agent = user_agent
+        self.proxy = proxy
+        self.on_response = None #called with (route, headers) after every response
+        self._session = None
+
+
+    @staticmethod
+    def handles(route):
+        return route.path.startswith(_HANDLED_PREFIXES)
+
+
+    def _get_session(self):
+        session = self._session
+        if session is None or session.closed:
+            connector = TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.ttl_dns_cache,
+                use_dns_cache=self.ttl_dns_cache is not None,
+            )
+            headers = {'User-Agent': self.user_agent} if self.user_agent is not None else None
+            session = self._session = ClientSession(connector=connector, headers=headers)
+        return session
+
+
+    async def request(self, route, *, files=None, form=None, data=None, json=None, reason=None):
+        """Sends `route` the same way `bot.http.request` would, retrying on 429s and 500/502s."""
+        session = self._get_session()
+        url = self.base_url + route.path
+        headers = {}
+        if reason is not None:
+            headers['X-Audit-Log-Reason'] = quote(reason, safe='/ ')
+
+        if json is not None:
+            data = dumps_bytes(json)
+            headers['Content-Type'] = 'application/json'
+
+        response = None
+        body = None
+
+        for tries in range(self.max_retries):
+            if files:
+                for f in files:
+                    f.reset(seek=tries)
+
+            if form:
+                payload = FormData()
+                for params in form:
+                    payload.add_field(**params)
+            else:
+                payload = data
+
+            try:
+                async with session.request(route.method, url, data=payload, headers=headers, proxy=self.proxy) as response:
+                    body = await _json_or_text(response)
+
+                    if self.on_response is not None:
+                        self.on_response(route, response.headers)
+
+                    if 300 > response.status >= 200:
+                        return body
+
+                    if response.status == 429:
+                        if not isinstance(body, dict):
+                            #rate limited by Cloudflare rather than the API
+                            raise discord.HTTPException(response, body)
+                        await asyncio.sleep(body.get('retry_after', 1.0))
+                        continue
+
+                    if response.status in (500, 502):
+                        await asyncio.sleep(1 + tries * 2)
+                        continue
+
+                    if response.status == 403:
+                        raise discord.Forbidden(response, body)
+                    elif response.status == 404:
+                        raise discord.NotFound(response, body)
+                    elif response.status == 503:
+                        raise discord.DiscordServerError(response, body)
+                    raise discord.HTTPException(response, body)
+
+            except OSError as e:
+                #connection reset by peer, usually a keep-alive connection closed by the other end
+                if tries < self.max_retries - 1 and e.errno in (54, 10054):
+                    continue
+                raise
+
+        if response.status >= 500:
+            raise discord.DiscordServerError(response, body)
+        raise discord.HTTPException(response, body)
+
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
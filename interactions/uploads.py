@@ -0,0 +1,80 @@
+import asyncio
+import io
+import os
+import stat
+from aiohttp.payload import Payload
+
+
+class FileUpload(Payload):
+    """Streams a `discord.File` into a multipart request in chunks.
+
+    Files on disk are read with `os.pread` in the loop's default thread pool, so the event loop never blocks on disk IO,
+    and `BytesIO`s are written straight from their buffer without copying. Files up to `retain_limit` bytes keep their chunks
+    after the first attempt so retries don't read them again."""
+
+    def __init__(self, file, chunk_size=256 * 1024, retain_limit=8 * 1024 * 1024):
+        super().__init__(file.fp, filename=file.filename, content_type='application/octet-stream')
+        self.file = file
+        self.chunk_size = chunk_size
+        self._start = getattr(file, '_original_pos', 0)
+        self._fd = None
+        self._chunks = None
+
+        fp = file.fp
+        if isinstance(fp, io.BytesIO):
+            self._size = len(fp.getvalue()) - self._start
+            return
+
+        try:
+            fd = fp.fileno()
+            st = os.fstat(fd)
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            return
+
+        if stat.S_ISREG(st.st_mode):
+            self._fd = fd
+            self._size = st.st_size - self._start
+            if self._size <= retain_limit:
+                self._chunks = []
+
+
+    def _read(self, offset, size):
+        if self._fd is not None and hasattr(os, 'pread'):
+            return os.pread(self._fd, size, offset)
+
+        fp = self._value
+        fp.seek(offset)
+        return fp.read(size)
+
+
+    async def write(self, writer):
+        fp = self._value
+
+        if isinstance(fp, io.BytesIO):
+            #getvalue shares the BytesIO's bytes object rather than copying it
+            view = memoryview(fp.getvalue())
+            for offset in range(self._start, len(view), self.chunk_size):
+                await writer.write(view[offset:offset + self.chunk_size])
+            return
+
+        if self._chunks:
+            for chunk in self._chunks:
+                await writer.write(chunk)
+            return
+
+        loop = asyncio.get_running_loop()
+        offset = self._start
+        chunks = []
+
+        while True:
+            chunk = await loop.run_in_executor(None, self._read, offset, self.chunk_size)
+            if not chunk:
+                break
+
+            offset += len(chunk)
+            if self._chunks is not None:
+                chunks.append(chunk)
+            await writer.write(chunk)
+
+        if self._chunks is not None:
+            self._chunks = chunks
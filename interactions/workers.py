@@ -0,0 +1,240 @@
+import asyncio
+import discord
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import traceback
+from discord.state import ConnectionState
+from .handler import InteractionResponse, ComponentsHandler
+from .router import ComponentRouter
+from .guilds import GuildResolver
+from .deadline import DeferralScheduler
+from .transport import InteractionTransport
+
+
+class WorkerBot:
+    """The bot-like object handlers get inside a worker process.
+
+    There's no gateway connection or cache, so `get_guild`/`get_channel` always return `None` and guilds are
+    `PartialGuild`s. Interaction callbacks and webhook follow-ups only need the interaction token and go through an
+    `InteractionTransport`; everything else (`send`, `edit_message`, ...) needs the pool to be given the bot token."""
+
+    def __init__(self, loop, application_id, token=None, transport=None, allowed_mentions=None):
+        self.loop = loop
+        self.application_id = application_id
+        self.token = token
+        self.transport = transport or InteractionTransport()
+        self.user = discord.Object(application_id)
+        self.http = self.transport if token is None else discord.http.HTTPClient(loop=loop)
+        self._connection = ConnectionState(dispatch=self.dispatch, handlers={}, hooks={}, syncer=None,
+                                           http=self.http, loop=loop, allowed_mentions=allowed_mentions)
+        self._connection._get_client = lambda: self
+        self._listeners = {}
+
+        self.handler = ComponentsHandler(self)
+        self.handler.handler.use_transport(self.transport)
+        #workers don't see MESSAGE_UPDATEs, so they'd never notice a message being edited by anything else
+        self.handler.handler.edit_hashes = None
+        self.router = ComponentRouter(self)
+        self.guild_resolver = GuildResolver(self, fetch_missing=token is not None)
+        self.deferrals = None
+
+
+    async def login(self):
+        if self.token is not None:
+            data = await self.http.static_login(self.token, bot=True)
+            self.user = discord.ClientUser(state=self._connection, data=data)
+
+
+    async def close(self):
+        await self.transport.close()
+        if self.token is not None:
+            await self.http.close()
+
+
+    def get_guild(self, guild_id):
+        return None
+
+
+    def get_channel(self, channel_id):
+        return None
+
+
+    async def fetch_guild(self, guild_id):
+        data = await self.http.get_guild(guild_id)
+        return discord.Guild(data=data, state=self._connection)
+
+
+    def add_listener(self, func, name=None):
+        name = func.__name__ if name is None else name
+        self._listeners.setdefault(name, []).append(func)
+
+
+    def listen(self, name=None):
+        def decorator(func):
+            self.add_listener(func, name)
+            return func
+
+        return decorator
+
+
+    def dispatch(self, event, *args):
+        for func in self._listeners.get('on_' + event, ()):
+            self.loop.create_task(self._run_event(func, event, *args))
+
+
+    async def _run_event(self, func, event, *args):
+        try:
+            await func(*args)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            try:
+                await self.on_error(event, *args)
+            except asyncio.CancelledError:
+                pass
+
+
+    async def on_error(self, event, *args, **kwargs):
+        print(f'Ignoring exception in {event}', file=sys.stderr)
+        traceback.print_exc()
+
+
+    def handle_interaction(self, d, received_at):
+        resp = InteractionResponse.from_payload(self, d)
+        resp._received_at = received_at
+
+        if self.deferrals is not None:
+            self.deferrals.schedule(resp)
+
+        if not self.router.dispatch(resp):
+            if resp.component_type == 2:
+                self.dispatch('button_press', resp)
+            elif resp.component_type == 3:
+                self.dispatch('selection', resp)
+
+
+async def _run_worker(queue, setup, options):
+    loop = asyncio.get_running_loop()
+    bot = WorkerBot(
+        loop,
+        options['application_id'],
+        token=options['token'],
+        transport=InteractionTransport(**options['transport']),
+        allowed_mentions=options['allowed_mentions'],
+    )
+    await bot.login()
+
+    if options['auto_defer']:
+        bot.deferrals = DeferralScheduler(bot)
+
+    result = setup(bot)
+    if asyncio.iscoroutine(result):
+        await result
+
+    stopped = asyncio.Event()
+
+    def read():
+        #blocking reads happen on their own thread so the worker's loop only ever sees whole payloads
+        while True:
+            item = queue.get()
+            if item is None:
+                loop.call_soon_threadsafe(stopped.set)
+                return
+            loop.call_soon_threadsafe(bot.handle_interaction, item[1], item[0])
+
+    threading.Thread(target=read, name='interactions-worker-reader', daemon=True).start()
+
+    try:
+        await stopped.wait()
+        pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        if pending:
+            await asyncio.wait(pending, timeout=options['shutdown_timeout'])
+    finally:
+        await bot.close()
+
+
+def _worker_main(queue, setup, options):
+    try:
+        asyncio.run(_run_worker(queue, setup, options))
+    except KeyboardInterrupt:
+        pass
+
+
+class WorkerPool:
+    """Hands INTERACTION_CREATE payloads to a pool of worker processes instead of handling them on the bot's loop.
+
+    `setup` is called with each worker's `WorkerBot` (it may be a coroutine function) and registers the handlers,
+    through `bot.router` or `bot.add_listener(func, 'on_button_press')`. It has to be picklable, i.e. defined at module
+    level. Payloads are shared through a single queue, so whichever worker is free picks up the next one.
+
+    Pass the pool as `workers=` to `InitialiseComponentInteractionBase`; it's started there and should be closed
+    with `close()` when the bot shuts down."""
+
+    def __init__(self, setup, application_id, processes=None, *, token=None, auto_defer=False, allowed_mentions=None,
+                 transport_options=None, shutdown_timeout=5.0, context='spawn'):
+        self.setup = setup
+        self.processes = processes or os.cpu_count() or 1
+        self._ctx = multiprocessing.get_context(context)
+        self._queue = None
+        self._workers = []
+        self._options = {
+            'application_id': application_id,
+            'token': token,
+            'auto_defer': auto_defer,
+            'allowed_mentions': allowed_mentions,
+            'transport': transport_options or {},
+            'shutdown_timeout': shutdown_timeout,
+        }
+
+
+    def __len__(self):
+        return len(self._workers)
+
+
+    @property
+    def running(self):
+        return bool(self._workers)
+
+
+    def start(self):
+        if self._workers:
+            return
+
+        self._queue = self._ctx.Queue()
+        for i in range(self.processes):
+            process = self._ctx.Process(
+                target=_worker_main,
+                args=(self._queue, self.setup, self._options),
+                name=f'interactions-worker-{i}',
+                daemon=True,
+            )
+            process.start()
+            self._workers.append(process)
+
+
+    def submit(self, d, received_at=None):
+        """Queues a raw interaction payload. Never blocks, pickling and writing to the pipe happen on the queue's feeder thread."""
+        self._queue.put((time.monotonic() if received_at is None else received_at, d))
+
+
+    def close(self, timeout=None):
+        """Lets every worker finish what it's already been handed, then stops them."""
+        if not self._workers:
+            return
+
+        for _ in self._workers:
+            self._queue.put(None)
+
+        timeout = self._options['shutdown_timeout'] + 5 if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        for process in self._workers:
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+
+        self._queue.close()
+        self._workers = []
+        self._queue = None
@@ -0,0 +1,16 @@
+import json
+from benchmarks.stubs import StubHTTP
+
+
+class RecordingHTTP(StubHTTP):
+    """A `StubHTTP` that keeps `(method, path, JSON body)` for every request it answers."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sent = []
+
+
+    async def request(self, route, **kwargs):
+        data = kwargs.get('data')
+        self.sent.append((route.method, route.path, json.loads(data._value) if data is not None else None))
+        return await super().request(route, **kwargs)
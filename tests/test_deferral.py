@@ -0,0 +1,56 @@
+import asyncio
+import unittest
+import interactions
+from benchmarks.stubs import StubBot, interaction_payload
+from support import RecordingHTTP
+
+
+class AutoDeferralTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.http = RecordingHTTP()
+        self.bot = StubBot(asyncio.get_running_loop(), self.http)
+        self.base = interactions.InitialiseComponentInteractionBase(
+            self.bot,
+            auto_defer=interactions.DeferralScheduler(self.bot, deadline=0.1, margin=0.05)
+        )
+
+
+    async def click(self, handler, delay):
+        @self.bot.router.callback('button:0:0')
+        async def on_click(resp):
+            await asyncio.sleep(delay)
+            await handler(resp)
+
+        self.base.handle_interaction(interaction_payload()['d'])
+        await asyncio.sleep(delay + 0.1)
+        return self.http.sent
+
+
+    async def test_fast_response_is_not_deferred(self):
+        sent = await self.click(lambda resp: resp.respond('hi', ephemeral=True), 0)
+
+        self.assertEqual(len(sent), 1)
+        method, path, body = sent[0]
+        self.assertEqual((method, path), ('POST', '/interactions/555/interaction-token/callback'))
+        self.assertEqual(body['type'], 4)
+
+
+    async def test_slow_respond_is_a_follow_up_with_its_own_flags(self):
+        sent = await self.click(lambda resp: resp.respond('secret', ephemeral=True), 0.15)
+
+        self.assertEqual(sent[0], ('POST', '/interactions/555/interaction-token/callback', {'type': 6}))
+        method, path, body = sent[1]
+        self.assertEqual((method, path), ('POST', '/webhooks/5/interaction-token'))
+        self.assertEqual(body['content'], 'secret')
+        self.assertEqual(body['flags'], 64)
+        self.assertFalse(any(path.endswith('@original') for _, path, _ in sent))
+
+
+    async def test_slow_edit_original_edits_the_component_message(self):
+        sent = await self.click(lambda resp: resp.edit_original(content='edited'), 0.15)
+
+        self.assertEqual(sent[0], ('POST', '/interactions/555/interaction-token/callback', {'type': 6}))
+        method, path, body = sent[1]
+        self.assertEqual((method, path), ('PATCH', '/webhooks/5/interaction-token/messages/@original'))
+        self.assertEqual(body['content'], 'edited')
+        self.assertEqual(len(body['components']), 1)
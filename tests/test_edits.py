@@ -0,0 +1,69 @@
+import asyncio
+import unittest
+import discord
+import interactions
+from benchmarks.stubs import StubBot, interaction_payload
+from support import RecordingHTTP
+
+
+def message_update(message_id, edited_timestamp):
+    return discord.RawMessageUpdateEvent({'id': str(message_id), 'channel_id': '20', 'edited_timestamp': edited_timestamp})
+
+
+class SkipUnchangedEditTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.http = RecordingHTTP()
+        self.bot = StubBot(asyncio.get_running_loop(), self.http)
+        self.base = interactions.InitialiseComponentInteractionBase(self.bot)
+        self.handler = self.bot.handler.handler
+
+
+    async def click(self, data):
+        self.base.handle_interaction(data)
+        await asyncio.sleep(0.01)
+
+
+    async def test_identical_edit_is_skipped(self):
+        await self.handler.edit_message(20, 100, 'same', None, [])
+        await self.handler.edit_message(20, 100, 'same', None, [])
+        await self.handler.edit_message(20, 100, 'changed', None, [])
+
+        self.assertEqual([method for method, _, _ in self.http.sent], ['PATCH', 'PATCH'])
+
+
+    async def test_edit_is_sent_after_someone_else_edits(self):
+        await self.handler.edit_message(20, 100, 'same', None, [])
+        await self.base.on_raw_message_edit(message_update(100, '2021-06-01T00:00:01+00:00')) #our own edit
+        await self.handler.edit_message(20, 100, 'same', None, [])
+        self.assertEqual(len(self.http.sent), 1)
+
+        await self.base.on_raw_message_edit(message_update(100, '2021-06-01T00:00:02+00:00'))
+        await self.handler.edit_message(20, 100, 'same', None, [])
+        self.assertEqual(len(self.http.sent), 2)
+
+
+    async def test_response_edit_after_the_message_was_edited_through_a_click(self):
+        responses = []
+
+        @self.bot.router.callback('menu')
+        async def on_menu(resp):
+            responses.append(await resp.respond('menu'))
+
+        @self.bot.router.callback('pick')
+        async def on_pick(resp):
+            await resp.edit_original(content='B')
+
+        await self.click(interaction_payload('menu')['d'])
+        response = responses[0]
+        await response.edit(content='A')
+
+        #a click on the response message, which the stub gives the id 999
+        data = interaction_payload('pick', message_id=999)['d']
+        data['token'] = 'another-token'
+        await self.click(data)
+        await self.base.on_raw_message_edit(message_update(999, '2021-06-01T00:00:01+00:00'))
+
+        sent = len(self.http.sent)
+        await response.edit(content='A')
+        self.assertEqual(len(self.http.sent), sent + 1)
+        self.assertEqual(self.http.sent[-1][2]['content'], 'A')
@@ -0,0 +1,73 @@
+import asyncio
+import unittest
+import discord
+import interactions
+from benchmarks.stubs import StubBot
+
+
+def exhausted(scheduler, reset_after='0.01'):
+    async def send(route, **kwargs):
+        scheduler.update(scheduler.classify(route)[1], {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset-After': reset_after})
+    return send
+
+
+class RequestSchedulerTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.bot = StubBot(asyncio.get_running_loop())
+        self.scheduler = interactions.RequestScheduler(self.bot)
+
+
+    async def test_exhausted_buckets_are_dropped_once_they_reset(self):
+        send = exhausted(self.scheduler)
+        for i in range(1000):
+            await self.scheduler.request(discord.http.Route('PATCH', f'/webhooks/5/token-{i}/messages/@original'), send=send)
+
+        self.assertEqual(len(self.scheduler._buckets), 1000)
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(self.scheduler._buckets), 0)
+
+
+    async def test_waits_for_an_exhausted_bucket(self):
+        send = exhausted(self.scheduler, '0.1')
+        route = discord.http.Route('PATCH', '/webhooks/5/token/messages/@original')
+        await self.scheduler.request(route, send=send)
+
+        start = self.bot.loop.time()
+        await self.scheduler.request(route, send=send)
+        self.assertGreaterEqual(self.bot.loop.time() - start, 0.09)
+
+
+    async def test_runs_up_to_remaining_requests_per_bucket_at_once(self):
+        running = []
+        peak = []
+
+        async def send(route, **kwargs):
+            running.append(route)
+            peak.append(len(running))
+            await asyncio.sleep(0.05)
+            self.scheduler.update(self.scheduler.classify(route)[1], {'X-RateLimit-Remaining': '2', 'X-RateLimit-Reset-After': '5'})
+            running.remove(route)
+
+        route = lambda i: discord.http.Route('PATCH', '/channels/20/messages/{message_id}', message_id=i)
+        await self.scheduler.request(route(0), send=send)
+        await asyncio.gather(*(self.scheduler.request(route(i), send=send) for i in range(1, 5)))
+
+        self.assertEqual(max(peak), 2)
+
+
+    async def test_deletes_have_their_own_bucket(self):
+        edit = discord.http.Route('PATCH', '/channels/20/messages/{message_id}', message_id=1)
+        delete = discord.http.Route('DELETE', '/channels/20/messages/{message_id}', message_id=1)
+        self.assertNotEqual(self.scheduler.classify(edit)[1], self.scheduler.classify(delete)[1])
+
+
+    async def test_edits_in_one_channel_run_concurrently(self):
+        async def send(route, **kwargs):
+            await asyncio.sleep(0.1)
+
+        start = self.bot.loop.time()
+        await asyncio.gather(*(
+            self.scheduler.request(discord.http.Route('PATCH', '/channels/20/messages/{message_id}', message_id=i), send=send)
+            for i in range(5)
+        ))
+        self.assertLess(self.bot.loop.time() - start, 0.3)
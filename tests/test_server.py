@@ -0,0 +1,127 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+from aiohttp.test_utils import TestClient, TestServer
+import interactions
+from interactions import server
+from benchmarks.stubs import StubBot, interaction_payload
+from support import RecordingHTTP
+
+try:
+    from nacl.signing import SigningKey
+except ImportError:
+    SigningKey = None
+
+
+#signed with the Ed25519 key whose seed is bytes(range(32))
+SEED = bytes(range(32))
+PUBLIC_KEY = '03a107bff3ce10be1d70dd18e74bc09967e4d6309ba50d5f1ddc8664125531b8'
+PING_BODY = b'{"type":1}'
+PING_TIMESTAMP = '1700000000'
+PING_SIGNATURE = (
+    'c1098e97d711377f30225d53d94b89d43537f92e5b3afaddc590781b1f9f9d4b'
+    '2eeab335d370be3b9a090bc61a85b86448bc140dcd195f1569c2bff181257607'
+)
+
+
+def headers(signature, timestamp):
+    return {'X-Signature-Ed25519': signature, 'X-Signature-Timestamp': timestamp, 'Content-Type': 'application/json'}
+
+
+@unittest.skipIf(SigningKey is None, 'PyNaCl is not installed')
+class InteractionServerTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.http = RecordingHTTP()
+        self.bot = StubBot(asyncio.get_running_loop(), self.http)
+        self.base = interactions.InitialiseComponentInteractionBase(self.bot)
+        self.server = interactions.InteractionServer(self.base, PUBLIC_KEY, timeout=0.2)
+        self.client = TestClient(TestServer(self.server.app))
+        await self.client.start_server()
+
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+
+    def sign(self, body, timestamp='1700000000'):
+        signature = SigningKey(SEED).sign(timestamp.encode('utf-8') + body).signature.hex()
+        return headers(signature, timestamp)
+
+
+    async def post(self, body, headers):
+        resp = await self.client.post('/interactions', data=body, headers=headers)
+        return resp.status, await resp.read()
+
+
+    async def test_signed_ping(self):
+        status, body = await self.post(PING_BODY, headers(PING_SIGNATURE, PING_TIMESTAMP))
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), {'type': 1})
+
+
+    async def test_rejects_bad_signatures(self):
+        tampered = PING_SIGNATURE[:-2] + ('00' if PING_SIGNATURE[-2:] != '00' else '01')
+        cases = [
+            headers(tampered, PING_TIMESTAMP),
+            headers(PING_SIGNATURE, '1700000001'), #signature for a different timestamp
+            headers('not hex', PING_TIMESTAMP),
+            {'Content-Type': 'application/json'},
+        ]
+
+        for case in cases:
+            status, _ = await self.post(PING_BODY, case)
+            self.assertEqual(status, 401)
+
+
+    async def test_callback_is_the_http_response(self):
+        @self.bot.router.callback('button:0:0')
+        async def on_click(resp):
+            await resp.respond('hello', ephemeral=True)
+
+        body = json.dumps(interaction_payload()['d']).encode('utf-8')
+        status, response = await self.post(body, self.sign(body))
+
+        self.assertEqual(status, 200)
+        response = json.loads(response)
+        self.assertEqual(response['type'], 4)
+        self.assertEqual(response['data']['content'], 'hello')
+        self.assertEqual(self.bot.http.requests, 0)
+        self.assertEqual(self.bot.handler.handler._http_callbacks, {})
+
+
+    async def test_slow_respond_after_timeout_is_a_follow_up(self):
+        @self.bot.router.callback('button:0:0')
+        async def on_click(resp):
+            await asyncio.sleep(0.4)
+            await resp.respond('only you can see this', ephemeral=True)
+
+        body = json.dumps(interaction_payload()['d']).encode('utf-8')
+        status, response = await self.post(body, self.sign(body))
+
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(response), {'type': 6})
+
+        await asyncio.sleep(0.3)
+        self.assertEqual(len(self.http.sent), 1)
+        method, path, sent = self.http.sent[0]
+        self.assertEqual((method, path), ('POST', '/webhooks/5/interaction-token'))
+        self.assertEqual(sent['content'], 'only you can see this')
+        self.assertEqual(sent['flags'], 64)
+
+
+    async def test_releases_callback_when_handling_fails(self):
+        body = json.dumps(interaction_payload()['d']).encode('utf-8')
+
+        with mock.patch.object(self.base, 'handle_interaction', side_effect=KeyError('member')):
+            status, _ = await self.post(body, self.sign(body))
+
+        self.assertEqual(status, 500)
+        self.assertEqual(self.bot.handler.handler._http_callbacks, {})
+
+
+class InteractionServerWithoutNaClTests(unittest.TestCase):
+    def test_requires_pynacl(self):
+        with mock.patch.object(server, 'VerifyKey', None):
+            with self.assertRaises(RuntimeError):
+                interactions.InteractionServer(mock.Mock(workers=None), PUBLIC_KEY)
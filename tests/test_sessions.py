@@ -0,0 +1,33 @@
+import asyncio
+import unittest
+import discord
+import interactions
+from benchmarks.stubs import StubBot
+from support import RecordingHTTP
+
+
+class Pager(interactions.ComponentSession):
+    timeout = None
+
+
+class ComponentSessionTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.http = RecordingHTTP()
+        self.bot = StubBot(asyncio.get_running_loop(), self.http)
+        interactions.InitialiseComponentInteractionBase(self.bot)
+        self.session = Pager.bind(self.bot, 20, 100, [], data=1)
+
+
+    async def asyncTearDown(self):
+        self.session.stop()
+
+
+    async def test_edit_without_a_click_only_sends_what_was_passed(self):
+        await self.session.edit(content=2, embeds=[discord.Embed(title='Page 2')])
+
+        method, path, body = self.http.sent[0]
+        self.assertEqual((method, path), ('PATCH', '/channels/20/messages/100'))
+        self.assertEqual(body['content'], '2')
+        self.assertEqual(body['embeds'][0]['title'], 'Page 2')
+        self.assertNotIn('components', body)
+        self.assertIn('allowed_mentions', body)